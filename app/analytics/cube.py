@@ -0,0 +1,107 @@
+import functools
+import numpy as np
+import pandas as pd
+import data_store
+from analytics import gender
+
+# Dátová kocka kandidátov: počet kandidátov (a súčet ich veku) pre každú kombináciu
+# subjekt × veková skupina × titul × pohlavie × kraj trvalého pobytu × zvolenie.
+# Filtrovanie a súčty sú len výbery a súčty cez osi poľa, bez zoskupovania riadkov.
+# Kocka sa vytvára pre každé voľby zvlášť (election = ID volieb, None = predvolené).
+
+AGE_BINS = [0, 30, 40, 50, 60, np.inf]
+AGE_LABELS = ["do 30", "31 – 40", "41 – 50", "51 – 60", "61 a viac"]
+TITLE_LABELS = ["Bez titulu", "S titulom"]
+GENDER_LABELS = gender.CATEGORIES
+ELECTED_LABELS = ["Nezvolený", "Zvolený"]
+UNKNOWN_REGION = "Neurčený kraj"
+
+# Názvy osí v poradí, v akom sú uložené v poli
+DIMENSIONS = ["subjekt", "vek", "titul", "pohlavie", "kraj", "zvolenie"]
+
+
+# Kraj podľa obce trvalého pobytu; mestá s mestskými časťami (Bratislava, Košice) sa
+# hľadajú podľa názvu pred pomlčkou, obce s rovnakým názvom v dvoch krajoch sa neurčia
+def region_of_municipality(municipalities, election=None):
+    territory = data_store.get_table("tab0c", ["Názov kraja", "Názov obce"], election)
+    territory = territory[territory["Názov kraja"] != "Cudzina"].astype(str)
+    territory["Mesto"] = territory["Názov obce"].str.split(" - ").str[0]
+
+    lookup = {}
+    for column in ["Mesto", "Názov obce"]:
+        grouped = territory.groupby(column)["Názov kraja"]
+        regions = grouped.first().where(grouped.nunique() == 1, UNKNOWN_REGION)
+        lookup.update(regions.to_dict())
+    return municipalities.astype(str).map(lookup).fillna(UNKNOWN_REGION)
+
+
+# Kandidáti s hodnotami všetkých osí kocky
+def candidate_dimensions(election=None):
+    df = gender.candidates(election)
+    elected = data_store.get_table("tab07a", ["Číslo politického subjektu", "Poradie na hlasovacom lístku", "Poznámka"], election)
+    df = df.merge(elected.rename(columns={"Poznámka": "Výsledok"}), on=["Číslo politického subjektu", "Poradie na hlasovacom lístku"], how="left")
+
+    return pd.DataFrame({
+        "subjekt": df["Názov politického subjektu"].astype(str),
+        "vek": pd.cut(df["Vek"], AGE_BINS, labels=AGE_LABELS).astype(str),
+        "titul": np.where(df["Titul"].notna(), TITLE_LABELS[1], TITLE_LABELS[0]),
+        "pohlavie": df["Pohlavie"].astype(str).to_numpy(),
+        "kraj": region_of_municipality(df["Obec trvalého pobytu"], election),
+        "zvolenie": np.where(df["Výsledok"] == "zvolený", ELECTED_LABELS[1], ELECTED_LABELS[0]),
+        "Vek": df["Vek"].to_numpy("int64"),
+    })
+
+
+# Kocka: hodnoty osí a polia počtov a súčtov veku
+@functools.lru_cache(maxsize=data_store.MAX_LOADED_ELECTIONS)
+def _build(election):
+    df = candidate_dimensions(election)
+    parties = data_store.get_table("tab0a", ["Názov politického subjektu"], election)["Názov politického subjektu"].astype(str).tolist()
+    regions = sorted(r for r in df["kraj"].unique() if r != UNKNOWN_REGION) + [UNKNOWN_REGION]
+    labels = {
+        "subjekt": parties,
+        "vek": AGE_LABELS,
+        "titul": TITLE_LABELS,
+        "pohlavie": GENDER_LABELS,
+        "kraj": regions,
+        "zvolenie": ELECTED_LABELS,
+    }
+
+    shape = tuple(len(labels[dim]) for dim in DIMENSIONS)
+    codes = [pd.Categorical(df[dim], categories=labels[dim]).codes for dim in DIMENSIONS]
+    flat = np.ravel_multi_index(codes, shape)
+    counts = np.bincount(flat, minlength=np.prod(shape)).reshape(shape)
+    age_sums = np.bincount(flat, weights=df["Vek"], minlength=np.prod(shape)).reshape(shape)
+    return labels, counts, age_sums
+
+
+def build(election=None):
+    return _build(data_store.election_id(election))
+
+
+# Výber buniek podľa filtrov {os: [hodnoty]}; prázdny alebo chýbajúci filter znamená všetky hodnoty
+def _select(array, labels, filters, skip=None):
+    for axis, dim in enumerate(DIMENSIONS):
+        values = (filters or {}).get(dim)
+        if dim == skip or not values:
+            continue
+        positions = [labels[dim].index(value) for value in values if value in labels[dim]]
+        array = np.take(array, positions, axis=axis)
+    return array
+
+
+# Počty kandidátov podľa jednej osi; filter tejto osi sa neuplatní (krížové filtrovanie)
+def counts_by(dim, filters=None, election=None):
+    labels, counts, _ = build(election)
+    selected = _select(counts, labels, filters, skip=dim)
+    axis = DIMENSIONS.index(dim)
+    totals = selected.sum(axis=tuple(i for i in range(selected.ndim) if i != axis))
+    return pd.Series(totals, index=labels[dim], name="Počet kandidátov")
+
+
+# Počet kandidátov a priemerný vek pri všetkých filtroch
+def summary(filters=None, election=None):
+    labels, counts, age_sums = build(election)
+    count = int(_select(counts, labels, filters).sum())
+    age = _select(age_sums, labels, filters).sum() / count if count else float("nan")
+    return count, age
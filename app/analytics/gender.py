@@ -0,0 +1,63 @@
+import functools
+import pandas as pd
+import data_store
+
+# Odhad pohlavia kandidátov podľa krstného mena: najprv slovník mien, ktoré sa neriadia
+# koncovkou (maďarské a cudzie mená), potom ženská koncovka priezviska (-ová, -á)
+# a nakoniec koncovka mena na "a". Výpočet prebieha raz pre každú jedinečnú dvojicu.
+
+CATEGORIES = ["Muž", "Žena"]
+
+# Mužské mená končiace na "a"
+MALE_NAMES = frozenset({
+    "attila", "atila", "béla", "csaba", "gejza", "gyula", "jozua", "kuba", "luca",
+    "mikola", "nikita", "saša", "ilja", "kosta", "sava",
+})
+
+# Ženské mená, ktoré nekončia na "a"
+FEMALE_NAMES = frozenset({
+    "ágnes", "agnes", "anett", "annemarie", "beatrix", "bernadett", "carmen", "dagmar", "doris",
+    "edit", "elisabeth", "enikő", "erzsébet", "ester", "gyöngyi", "ildikó", "ines", "ingrid",
+    "irén", "ivett", "izabel", "janette", "jasmin", "judit", "karin", "katalin", "margit",
+    "marianne", "miriam", "mirjam", "nikol", "nikolett", "noémi", "ráchel", "rút", "ruth",
+    "tünde", "virág", "vivien",
+})
+
+FEMALE_SURNAME_SUFFIXES = ("ová", "á")
+
+
+@functools.lru_cache(maxsize=None)
+def infer(first_name, surname=""):
+    name = str(first_name).split()[0].lower() if str(first_name).strip() else ""
+    if name in MALE_NAMES:
+        return "Muž"
+    if name in FEMALE_NAMES:
+        return "Žena"
+    # Pri dvojitom priezvisku rozhoduje posledná časť (napr. Drapáková-Hubová)
+    last = str(surname).replace("-", " ").split()[-1].lower() if str(surname).strip() else ""
+    if last.endswith(FEMALE_SURNAME_SUFFIXES):
+        return "Žena"
+    return "Žena" if name.endswith("a") else "Muž"
+
+
+# Stĺpec pohlavia (kategória Muž/Žena) pre tabuľku s menami; odhad sa robí len
+# pre jedinečné dvojice meno–priezvisko a výsledok sa rozšíri na všetky riadky
+def column(df, first_name="Meno", surname="Priezvisko"):
+    names = df[first_name].fillna("").astype(str)
+    surnames = df[surname].fillna("").astype(str) if surname in df.columns else pd.Series("", index=df.index)
+    pairs = pd.MultiIndex.from_arrays([names, surnames])
+    codes, unique = pd.factorize(pairs)
+    values = pd.Categorical([infer(*pair) for pair in unique], categories=CATEGORIES)
+    return pd.Series(values.take(codes), index=df.index, name="Pohlavie")
+
+
+# Kandidáti z tab0b so stĺpcom pohlavia (spoločný pre stránky aj notebooky)
+@functools.lru_cache(maxsize=data_store.MAX_LOADED_ELECTIONS)
+def _candidates(election):
+    df = data_store.get_table("tab0b", election=election)
+    df["Pohlavie"] = column(df)
+    return df
+
+
+def candidates(election=None):
+    return _candidates(data_store.election_id(election)).copy(deep=False)
@@ -0,0 +1,291 @@
+import glob
+import os
+import threading
+import time
+from collections import deque
+import numpy as np
+import pandas as pd
+import data_store
+from analytics import precincts, rollup, seats, votes
+
+# Priebežné výsledky počas volebnej noci: sledovač číta okrskové výsledky z priečinka
+# (LIVE_RESULTS_DIR) a každý nový alebo zmenený súbor pripočíta ako rozdiel k súčtom
+# za kraje, okresy a SR. Opravený okrsok sa nahradí, takže sa nezapočíta dvakrát.
+# Po každej zmene sa prepočíta projekcia mandátov a zavolajú sa prihlásení poslucháči.
+
+DROP_DIR = os.environ.get("LIVE_RESULTS_DIR")
+
+# Voľby, ktorých priebežné výsledky sa spracúvajú (ich tabuľky dávajú útvary, subjekty
+# a počet okrskov); None = predvolené voľby dátovej vrstvy
+ELECTION = os.environ.get("LIVE_ELECTION")
+POLL_INTERVAL = float(os.environ.get("LIVE_POLL_SECONDS", 1.0))
+
+CONFIRMED = "Počet potvrdených okrskových zápisníc"
+SUMMARY_COLUMNS = ["Počet zapísaných voličov", "Počet zúčastnených voličov", "Počet odovzdaných obálok na hlasovanie",
+                   "Počet platných hlasov spolu"]
+
+# Úrovne súčtov: stĺpec s kódom útvaru a tabuľka s počtom okrskov a názvami útvarov
+LEVELS = {
+    "kraj": ("Kód kraja", "tab02a"),
+    "okres": ("Kód okresu", "tab02c"),
+}
+
+# Posledné chyby pri spracovaní súborov (súbor, správa)
+errors = deque(maxlen=50)
+
+_lock = threading.RLock()
+_listeners = []
+_seen = {}
+_state = {}
+_watcher = {"thread": None, "stop": None}
+
+
+# Čísla subjektov v poradí stĺpcov súčtov
+def _parties():
+    return sorted(votes._party_numbers(ELECTION).values())
+
+
+def _columns():
+    return [CONFIRMED, *SUMMARY_COLUMNS, *_parties()]
+
+
+def _empty_totals(level):
+    code_column, table = LEVELS[level]
+    codes = data_store.get_table(table, [code_column], ELECTION)[code_column].to_numpy("int64")
+    return pd.DataFrame(0, index=pd.Index(codes, name=code_column), columns=_columns(), dtype="int64")
+
+
+# Prázdny stav pred prvým okrskom
+def reset():
+    with _lock:
+        _seen.clear()
+        _state.clear()
+        _state["version"] = 0
+        _state["files"] = 0
+        _state["updated"] = None
+        _state["precincts"] = pd.DataFrame(columns=["Kód kraja", "Kód okresu", *_columns()], dtype="int64")
+        _state["totals"] = {level: _empty_totals(level) for level in LEVELS}
+        _state["sr"] = pd.Series(0, index=_columns(), dtype="int64")
+        _state["projection"] = None
+
+
+def _ensure_state():
+    if not _state:
+        reset()
+
+
+# Okrskové záznamy súboru: index = kód okrsku, stĺpce = súhrnné počty a/alebo hlasy subjektov
+def read_report(path):
+    batches = list(precincts.read_batches(path))
+    if not batches:
+        return pd.DataFrame()
+    df = pd.concat(batches, ignore_index=True)
+    numbers = votes._party_numbers(ELECTION)
+    df = df.rename(columns={column: numbers[column[len(votes.VOTES_PREFIX):]] for column in df.columns
+                            if column.startswith(votes.VOTES_PREFIX)})
+    df.index = pd.Index(df["Kód obce"].to_numpy("int64") * 1000 + df["Okrsok"].to_numpy("int64"), name="Kód okrsku")
+    # Ak je okrsok v súbore viackrát, platí posledný záznam
+    df = df[~df.index.duplicated(keep="last")]
+    columns = [column for column in _columns()[1:] if column in df.columns]
+    if not columns:
+        raise ValueError("Súbor neobsahuje žiadne počty okrskových výsledkov.")
+    return df[["Kód kraja", "Kód okresu", *columns]]
+
+
+# Pripočítanie okrskových záznamov ako rozdielu voči predchádzajúcemu stavu okrskov
+def apply_report(report):
+    if report.empty:
+        return 0
+    with _lock:
+        _ensure_state()
+        stored = _state["precincts"]
+        new = report.index.difference(stored.index)
+        if len(new):
+            added = pd.DataFrame(0, index=new, columns=stored.columns, dtype="int64")
+            added[["Kód kraja", "Kód okresu"]] = report.loc[new, ["Kód kraja", "Kód okresu"]].to_numpy("int64")
+            stored = _state["precincts"] = pd.concat([stored, added]) if len(stored) else added
+
+        columns = [column for column in report.columns if column not in ("Kód kraja", "Kód okresu")]
+        previous = stored.loc[report.index, [CONFIRMED, *columns]]
+        current = report[columns].astype("int64")
+        delta = pd.DataFrame(0, index=report.index, columns=_columns(), dtype="int64")
+        delta[columns] = current.to_numpy() - previous[columns].to_numpy()
+        delta[CONFIRMED] = 1 - previous[CONFIRMED].to_numpy()
+        stored.loc[report.index, columns] = current.to_numpy()
+        stored.loc[report.index, CONFIRMED] = 1
+
+        codes = stored.loc[report.index, ["Kód kraja", "Kód okresu"]]
+        for level, (code_column, _) in LEVELS.items():
+            part = delta.groupby(codes[code_column].to_numpy("int64")).sum()
+            _state["totals"][level] = _state["totals"][level].add(part, fill_value=0).astype("int64")
+        _state["sr"] = _state["sr"] + delta.sum()
+
+        national = _state["sr"]
+        _state["projection"] = seats.allocate(national[_parties()].to_numpy("int64"),
+                                              total_valid=national["Počet platných hlasov spolu"])
+        _state["version"] += 1
+        _state["files"] += 1
+        _state["updated"] = time.time()
+        version = _state["version"]
+
+    _notify(version)
+    return len(report)
+
+
+# Poslucháč dostane číslo verzie po každej zmene súčtov; vráti funkciu na odhlásenie
+def subscribe(listener):
+    with _lock:
+        _listeners.append(listener)
+    return lambda: unsubscribe(listener)
+
+
+def unsubscribe(listener):
+    with _lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+
+
+def _notify(version):
+    with _lock:
+        listeners = list(_listeners)
+    for listener in listeners:
+        try:
+            listener(version)
+        except Exception as error:  # chyba poslucháča nesmie zastaviť sledovač
+            errors.append(("poslucháč", str(error)))
+
+
+# Jedno prezretie priečinka: spracujú sa nové a zmenené súbory v poradí podľa času zmeny.
+# Súbory sa majú do priečinka zapisovať pod iným názvom a potom premenovať (*.tmp sa ignoruje).
+def poll_once(drop_dir=None):
+    drop_dir = drop_dir or DROP_DIR
+    paths = []
+    for path in glob.glob(os.path.join(drop_dir, "*.csv")):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if _seen.get(path) != signature:
+            paths.append((stat.st_mtime_ns, path, signature))
+
+    applied = 0
+    for _, path, signature in sorted(paths):
+        _seen[path] = signature
+        try:
+            applied += apply_report(read_report(path))
+        except (OSError, ValueError, KeyError) as error:
+            errors.append((os.path.basename(path), str(error)))
+    return applied
+
+
+def _watch(drop_dir, interval, stop):
+    while not stop.is_set():
+        poll_once(drop_dir)
+        stop.wait(interval)
+
+
+# Sledovač priečinka vo vlákne na pozadí; bez nastaveného priečinka sa nespustí
+def start(drop_dir=None, interval=None):
+    drop_dir = drop_dir or DROP_DIR
+    if not drop_dir or running():
+        return _watcher["thread"]
+    os.makedirs(drop_dir, exist_ok=True)
+    with _lock:
+        _ensure_state()
+    stop = threading.Event()
+    thread = threading.Thread(target=_watch, args=(drop_dir, interval or POLL_INTERVAL, stop), name="live-results", daemon=True)
+    _watcher.update(thread=thread, stop=stop)
+    thread.start()
+    return thread
+
+
+def stop():
+    if _watcher["stop"] is not None:
+        _watcher["stop"].set()
+        _watcher["thread"].join()
+    _watcher.update(thread=None, stop=None)
+
+
+def running():
+    return _watcher["thread"] is not None and _watcher["thread"].is_alive()
+
+
+def version():
+    return _state.get("version", 0)
+
+
+# Stav spracovania: počet okrskov, potvrdených zápisníc, súborov a čas poslednej zmeny
+def progress():
+    with _lock:
+        _ensure_state()
+        total = int(data_store.get_table("tab01", ["Počet volebných okrskov"], ELECTION).iloc[0, 0])
+        confirmed = int(_state["sr"][CONFIRMED])
+        return {
+            "version": _state["version"],
+            "Počet volebných okrskov": total,
+            CONFIRMED: confirmed,
+            "Podiel potvrdených okrskových zápisníc v %": (10000 * confirmed // total) / 100,
+            "files": _state["files"],
+            "updated": _state["updated"],
+        }
+
+
+# Súhrnné priebežné výsledky za kraje, okresy alebo SR (v tvare tab02a/tab02c/tab01)
+def summary(level="sr"):
+    with _lock:
+        _ensure_state()
+        totals = _state["sr"].to_frame().T if level == "sr" else _state["totals"][level].copy()
+
+    if level == "sr":
+        df = data_store.get_table("tab01", ["Počet volebných okrskov"], ELECTION)
+    else:
+        code_column, table = LEVELS[level]
+        name_column = code_column.replace("Kód", "Názov")
+        df = data_store.get_table(table, [code_column, name_column, "Počet volebných okrskov"], ELECTION)
+        df = df[df[code_column].isin(totals.index)]
+        totals = totals.loc[df[code_column].to_numpy("int64")]
+    df = df.reset_index(drop=True)
+    df[CONFIRMED] = totals[CONFIRMED].to_numpy()
+    df["Podiel potvrdených okrskových zápisníc v %"] = rollup._share(df[CONFIRMED], df["Počet volebných okrskov"])
+    for column in SUMMARY_COLUMNS:
+        df[column] = totals[column].to_numpy()
+    df["Účasť voličov v %"] = rollup._share(df["Počet zúčastnených voličov"], df["Počet zapísaných voličov"])
+    return df
+
+
+# Priebežné hlasy a podiely subjektov za SR s projekciou mandátov
+def projection():
+    with _lock:
+        _ensure_state()
+        national = _state["sr"].copy()
+        allocation = _state["projection"]
+
+    df = data_store.get_table("tab0a", ["Číslo politického subjektu", "Názov politického subjektu", "Skratka politického subjektu"],
+                              ELECTION)
+    df = df.set_index("Číslo politického subjektu").loc[_parties()].reset_index()
+    df["Počet platných hlasov"] = national[_parties()].to_numpy("int64")
+    df["Podiel platných hlasov v %"] = rollup._share(df["Počet platných hlasov"],
+                                                     pd.Series(national["Počet platných hlasov spolu"], index=df.index))
+    df["Počet mandátov"] = allocation.seats if allocation is not None else 0
+    return df
+
+
+# Náhradný zdroj na skúšku: konečné okrskové výsledky (tab02e a tab08e) sa v náhodnom
+# poradí zapisujú do priečinka po dávkach, ako by prichádzali počas volebnej noci;
+# generátor vráti cestu každého súboru hneď po jeho zapísaní
+def replay(drop_dir, precincts_per_file=300, delay=1.0, seed=None):
+    summary_df = pd.concat(precincts.read_batches(data_store.table_path("tab02e", ELECTION)), ignore_index=True)
+    votes_df = pd.concat(precincts.read_batches(data_store.table_path("tab08e", ELECTION)), ignore_index=True)
+    party_columns = [column for column in votes_df.columns if column.startswith(votes.VOTES_PREFIX)]
+    df = summary_df.merge(votes_df[["Kód obce", "Okrsok", *party_columns]], on=["Kód obce", "Okrsok"], how="left")
+    df = df.iloc[np.random.default_rng(seed).permutation(len(df))]
+
+    os.makedirs(drop_dir, exist_ok=True)
+    for number, start in enumerate(range(0, len(df), precincts_per_file), start=1):
+        path = os.path.join(drop_dir, f"okrsky_{number:04d}.csv")
+        df.iloc[start:start + precincts_per_file].to_csv(f"{path}.tmp", index=False)
+        os.replace(f"{path}.tmp", path)
+        yield path
+        if delay:
+            time.sleep(delay)
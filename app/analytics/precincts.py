@@ -0,0 +1,94 @@
+import pandas as pd
+import data_store
+from analytics import rollup
+
+# Prúdové spracovanie okrskových tabuliek (tab02e, tab08e): súbor sa číta po dávkach,
+# každá dávka sa overí a pretypuje a pripočíta k priebežným súčtom za vyššie úrovne.
+# Celá široká tabuľka sa nikdy nedrží v pamäti.
+
+CHUNK_SIZE = 1000
+
+CODE_COLUMNS = ["Kód kraja", "Kód územného obvodu", "Kód okresu", "Kód obce", "Okrsok"]
+NAME_COLUMNS = ["Názov kraja", "Názov územného obvodu", "Názov okresu", "Názov obce"]
+
+# Kľúče zoskupenia pre jednotlivé úrovne (kód aj názov útvaru)
+LEVELS = {
+    "kraj": ["Kód kraja", "Názov kraja"],
+    "okres": ["Kód kraja", "Názov kraja", "Kód okresu", "Názov okresu"],
+}
+
+
+def _header(path):
+    return pd.read_csv(path, nrows=0).columns.tolist()
+
+
+# Načítavajú sa len kódy, názvy a počty; percentá sa dajú kedykoľvek dopočítať
+def _count_columns(columns):
+    return [column for column in columns if column.startswith("Počet")]
+
+
+# Overenie a pretypovanie jednej dávky
+def validate_batch(batch, count_columns):
+    missing = [column for column in CODE_COLUMNS if column not in batch.columns]
+    if missing:
+        raise ValueError(f"V okrskovej tabuľke chýbajú stĺpce: {', '.join(missing)}")
+    if batch[CODE_COLUMNS].isna().any().any():
+        raise ValueError("Okrskový záznam bez kódu územného útvaru.")
+
+    batch = batch.astype({column: "int32" for column in CODE_COLUMNS})
+    # Prázdna hodnota v počte znamená, že v okrsku nebol zaznamenaný žiadny hlas
+    counts = batch[count_columns].fillna(0)
+    if (counts < 0).any().any():
+        raise ValueError("Okrskový záznam so záporným počtom hlasov.")
+    batch[count_columns] = counts.astype("int64")
+    return batch
+
+
+# Generátor overených dávok okrskovej tabuľky
+def read_batches(path, chunksize=CHUNK_SIZE):
+    columns = _header(path)
+    count_columns = _count_columns(columns)
+    usecols = [c for c in columns if c in CODE_COLUMNS or c in NAME_COLUMNS or c in count_columns]
+    dtype = {column: "category" for column in NAME_COLUMNS}
+    dtype.update({column: "float64" for column in count_columns})
+
+    for batch in pd.read_csv(path, usecols=usecols, dtype=dtype, chunksize=chunksize):
+        yield validate_batch(batch, count_columns)
+
+
+# Pripočítanie dávky k priebežným súčtom všetkých úrovní
+def fold_batch(aggregates, batch):
+    count_columns = _count_columns(batch.columns)
+    batch = batch.assign(**{"Počet okrskov": 1})
+    count_columns = ["Počet okrskov", *count_columns]
+
+    for level, keys in LEVELS.items():
+        part = batch.groupby(keys, observed=True)[count_columns].sum()
+        current = aggregates.get(level)
+        aggregates[level] = part if current is None else current.add(part, fill_value=0).astype("int64")
+
+    total = batch[count_columns].sum()
+    aggregates["sr"] = total if "sr" not in aggregates else aggregates["sr"] + total
+    return aggregates
+
+
+# Súčty za kraje, okresy a celú SR z okrskovej tabuľky (napr. "tab08e")
+def aggregate(code="tab08e", chunksize=CHUNK_SIZE, path=None, election=None):
+    aggregates = {}
+    for batch in read_batches(path or data_store.table_path(code, election), chunksize):
+        fold_batch(aggregates, batch)
+    aggregates["sr"] = aggregates["sr"].to_frame().T
+    return aggregates
+
+
+# Dopočítanie podielov v % z agregovaných počtov (účasť a podiely strán); podiely sa
+# orezávajú na dve desatinné miesta ako v publikovaných tabuľkách (rollup._share)
+def with_shares(df):
+    df = df.copy()
+    if "Počet zapísaných voličov" in df.columns:
+        df["Účasť voličov v %"] = rollup._share(df["Počet zúčastnených voličov"], df["Počet zapísaných voličov"])
+    if "Počet platných hlasov spolu" in df.columns:
+        for column in [c for c in df.columns if c.startswith("Počet platných hlasov za ")]:
+            party = column[len("Počet platných hlasov za "):]
+            df[f"Podiel platných hlasov v % za {party}"] = rollup._share(df[column], df["Počet platných hlasov spolu"])
+    return df
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import data_store
+from analytics import seats
+
+# Poradie kandidátov po zohľadnení prednostných hlasov: kandidáti, ktorí získali aspoň 3 %
+# prednostných hlasov z platných hlasov svojho subjektu, sa presunú na začiatok listiny
+# (zoradení podľa počtu prednostných hlasov), ostatní zostávajú v poradí na hlasovacom lístku.
+# Celý výpočet je jedno zoradenie všetkých kandidátov naraz.
+
+PREFERENCE_THRESHOLD = 3.0
+
+# Poznámka pri kandidátoch, ktorí sa vzdali kandidatúry alebo boli odvolaní
+WITHDRAWN = "X"
+
+
+# Kandidáti s počtom prednostných hlasov a počtom platných hlasov ich subjektu za SR
+def candidates(election=None):
+    df = data_store.get_table("tab07a", election=election)
+    party_votes = data_store.get_table("tab03a", ["Číslo politického subjektu", "Počet platných hlasov"], election)
+    return df.merge(party_votes, on="Číslo politického subjektu", how="left")
+
+
+# Nové poradie pre každého kandidáta (NaN pre kandidátov, ktorí sa vzdali);
+# party_votes sú platné hlasy subjektu pre každého kandidáta
+def reorder(party, ballot_order, preference_votes, party_votes, eligible=None, threshold=PREFERENCE_THRESHOLD):
+    party = np.asarray(party, dtype="int64")
+    ballot_order = np.asarray(ballot_order, dtype="int64")
+    preference_votes = np.asarray(preference_votes, dtype="int64")
+    party_votes = np.asarray(party_votes, dtype="int64")
+    eligible = np.ones(len(party), dtype=bool) if eligible is None else np.asarray(eligible, dtype=bool)
+
+    qualified = eligible & (preference_votes * 100 >= threshold * party_votes) & (party_votes > 0)
+    order = np.lexsort((
+        ballot_order,
+        np.where(qualified, -preference_votes, 0),
+        ~qualified,
+        ~eligible,
+        party,
+    ))
+
+    # Poradie v rámci subjektu = pozícia v zoradení mínus začiatok skupiny subjektu
+    sorted_party = party[order]
+    starts = np.flatnonzero(np.r_[True, sorted_party[1:] != sorted_party[:-1]])
+    group_start = np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+    ranks = np.empty(len(order), dtype="float64")
+    ranks[order] = np.arange(len(order)) - group_start + 1
+    ranks[~eligible] = np.nan
+    return ranks, qualified
+
+
+# Kandidáti s vypočítaným poradím; seats_by_party (číslo subjektu -> mandáty) určí zvolených,
+# predvolene podľa výsledku prideľovania mandátov z tab03a
+def ranked_candidates(seats_by_party=None, party_votes=None, threshold=PREFERENCE_THRESHOLD, election=None):
+    df = candidates(election)
+    if party_votes is not None:
+        df["Počet platných hlasov"] = df["Číslo politického subjektu"].map(party_votes).fillna(0).astype("int64")
+    if seats_by_party is None:
+        allocation = seats.allocation_table(election=election)
+        seats_by_party = dict(zip(allocation["Číslo politického subjektu"], allocation["Pridelené mandáty spolu"]))
+
+    eligible = (df["Poznámka"] != WITHDRAWN).to_numpy()
+    ranks, qualified = reorder(
+        df["Číslo politického subjektu"], df["Poradie na hlasovacom lístku"], df["Počet platných prednostných hlasov"],
+        df["Počet platných hlasov"], eligible, threshold
+    )
+    party_seats = df["Číslo politického subjektu"].map(seats_by_party).fillna(0).to_numpy()
+
+    df["Vypočítané poradie"] = ranks
+    df["Splnil podmienku prednostných hlasov"] = qualified
+    df["Zvolený"] = eligible & (ranks <= party_seats)
+    return df
+
+
+# Zvolení poslanci (pre scenár mandátov alebo skutočný výsledok)
+def elected(seats_by_party=None, party_votes=None, threshold=PREFERENCE_THRESHOLD, election=None):
+    df = ranked_candidates(seats_by_party, party_votes, threshold, election)
+    df = df[df["Zvolený"]].sort_values(["Číslo politického subjektu", "Vypočítané poradie"])
+    return df[["Číslo politického subjektu", "Názov politického subjektu", "Vypočítané poradie",
+               "Poradie na hlasovacom lístku", "Meno", "Priezvisko", "Počet platných prednostných hlasov"]].reset_index(drop=True)
+
+
+# Porovnanie s tab07a (poradie subjektov, ktoré postúpili) a so zoznamom zvolených v tab06
+def check_against_published(election=None):
+    df = ranked_candidates(election=election)
+    differences = []
+
+    published = df["Poradie po zohľadnení prednostného hlasovania"]
+    compared = published.notna()
+    mismatch = df[compared & (df["Vypočítané poradie"] != published)]
+    if len(mismatch):
+        differences.append(f"poradie: {len(mismatch)} kandidátov")
+
+    keys = ["Číslo politického subjektu", "Poradie na hlasovacom lístku"]
+    computed = pd.MultiIndex.from_frame(df.loc[df["Zvolený"], keys])
+    tab06 = pd.MultiIndex.from_frame(data_store.get_table("tab06", keys, election))
+    if not computed.sort_values().equals(tab06.sort_values()):
+        differences.append(f"zvolení: {len(computed.difference(tab06))} navyše, {len(tab06.difference(computed))} chýba")
+    return differences
@@ -0,0 +1,72 @@
+import functools
+import numpy as np
+import data_store
+
+# Index poradia kandidátov podľa prednostných hlasov: pre každú kombináciu
+# (úroveň, útvar, subjekt) sú vopred zoradené pozície riadkov, takže výber
+# prvých k kandidátov je len výrez poľa a k riadkov tabuľky. Index sa vytvára pre
+# každé voľby zvlášť (election = ID volieb, None = predvolené).
+
+# Úroveň: tabuľka s prednostnými hlasmi a stĺpec s kódom útvaru (SR má jediný útvar)
+LEVELS = {
+    "sr": ("tab07a", None),
+    "kraj": ("tab07b", "Kód kraja"),
+}
+
+VOTES = "Počet platných prednostných hlasov"
+
+COLUMNS = ["Číslo politického subjektu", "Názov politického subjektu", "Poradie na hlasovacom lístku",
+           "Meno", "Priezvisko", "Celé meno", VOTES]
+
+
+# Hranice skupín v zoradenom poli: (kľúč skupiny, začiatok, koniec)
+def _groups(keys, order):
+    sorted_keys = [key[order] for key in keys]
+    change = np.zeros(len(order), dtype=bool)
+    change[0] = True
+    for key in sorted_keys:
+        change[1:] |= key[1:] != key[:-1]
+    starts = np.flatnonzero(change)
+    ends = np.r_[starts[1:], len(order)]
+    for start, end in zip(starts, ends):
+        yield tuple(int(key[start]) for key in sorted_keys), start, end
+
+
+# Index jednej úrovne: tabuľka kandidátov a zoradené pozície pre každý (útvar, subjekt);
+# subjekt None znamená všetkých kandidátov útvaru
+@functools.lru_cache(maxsize=None)
+def _index(level, election):
+    code, area_column = LEVELS[level]
+    df = data_store.get_table(code, election=election)
+    df["Celé meno"] = df["Meno"].astype(str) + " " + df["Priezvisko"].astype(str)
+    frame = df[COLUMNS + ([area_column] if area_column else [])].reset_index(drop=True)
+
+    area = np.zeros(len(frame), dtype="int64") if area_column is None else frame[area_column].to_numpy("int64")
+    party = frame["Číslo politického subjektu"].to_numpy("int64")
+    votes = frame[VOTES].to_numpy("int64")
+    ballot = frame["Poradie na hlasovacom lístku"].to_numpy("int64")
+
+    # Jedno zoradenie pre skupiny (útvar, subjekt) a jedno pre celé útvary; pri rovnosti
+    # hlasov rozhoduje číslo subjektu a poradie na hlasovacom lístku
+    positions = {}
+    by_party = np.lexsort((ballot, -votes, party, area))
+    for (area_code, party_code), start, end in _groups([area, party], by_party):
+        positions[(area_code, party_code)] = by_party[start:end]
+    by_area = np.lexsort((ballot, party, -votes, area))
+    for (area_code,), start, end in _groups([area], by_area):
+        positions[(area_code, None)] = by_area[start:end]
+    return frame, positions
+
+
+# Prvých k kandidátov útvaru (area je kód útvaru, pre SR sa nezadáva), prípadne len jedného subjektu
+def top(level, area=None, party=None, k=10, election=None):
+    frame, positions = _index(level, data_store.election_id(election))
+    key = (0 if area is None else int(area), None if party is None else int(party))
+    if key not in positions:
+        return frame.iloc[:0]
+    return frame.iloc[positions[key][:k]]
+
+
+# Útvary úrovne, pre ktoré index obsahuje kandidátov
+def areas(level, election=None):
+    return sorted({area for area, party in _index(level, data_store.election_id(election))[1] if party is None})
@@ -0,0 +1,183 @@
+import functools
+import threading
+import numpy as np
+import pandas as pd
+import data_store
+from analytics import precincts, votes
+
+# Agregácia výsledkov po úrovniach územného členenia z najjemnejšej úrovne (okrsky).
+# Okrskové tabuľky tab02e a tab08e sa načítajú raz, každá vyššia úroveň sa dopočíta
+# zoskupením podľa kódov a výsledok sa uloží pod kľúčom (úroveň, ukazovateľ, filter, voľby).
+
+# Úrovne od najhrubšej po najjemnejšiu: stĺpec s kódom a s názvom útvaru
+LEVELS = {
+    "kraj": ("Kód kraja", "Názov kraja"),
+    "obvod": ("Kód územného obvodu", "Názov územného obvodu"),
+    "okres": ("Kód okresu", "Názov okresu"),
+    "obec": ("Kód obce", "Názov obce"),
+    "okrsok": ("Kód okrsku", "Okrsok"),
+}
+
+# Ukazovateľ s hlasmi pre politické subjekty (výsledok má stĺpec pre každý subjekt)
+PARTY_VOTES = "Počet platných hlasov"
+
+# Tabuľky, ktoré sa dajú zostaviť agregáciou (vrátane tab03e a tab03f, ktoré sa nedodávajú)
+SUMMARY_TABLES = {"tab02a": "kraj", "tab02b": "obvod", "tab02c": "okres", "tab02d": "obec", "tab02e": "okrsok"}
+PARTY_TABLES = {"tab03b": "kraj", "tab03c": "obvod", "tab03d": "okres", "tab03e": "obec", "tab03f": "okrsok"}
+
+_results = {}
+_lock = threading.Lock()
+
+
+# Okrsky so súhrnnými počtami; kód okrsku je zložený rovnako ako v analytics.votes
+@functools.lru_cache(maxsize=data_store.MAX_LOADED_ELECTIONS)
+def _precincts(election):
+    df = pd.concat(precincts.read_batches(data_store.table_path("tab02e", election)), ignore_index=True)
+    df["Kód okrsku"] = df["Kód obce"].astype("int64") * 1000 + df["Okrsok"]
+    df["Počet potvrdených okrskových zápisníc"] = np.int64(1)
+    return df
+
+
+# Hlasy pre subjekty v okrskoch: (poradie okrsku, stĺpec subjektu, hlasy) a čísla subjektov
+@functools.lru_cache(maxsize=data_store.MAX_LOADED_ELECTIONS)
+def _party_votes(election):
+    party_votes = votes.load("tab08e", election)
+    positions = pd.Index(_precincts(election)["Kód okrsku"]).get_indexer(party_votes.area_codes)
+    if (positions < 0).any():
+        raise ValueError("Okrsok z tab08e chýba v tab02e.")
+    rows = positions[np.repeat(np.arange(len(positions)), np.diff(party_votes.offsets))]
+    columns = np.searchsorted(party_votes.parties, party_votes.party_ids)
+    return rows, columns, party_votes.votes.astype("int64"), party_votes.parties
+
+
+# Súhrnné ukazovatele, ktoré sa dajú sčítať
+def metrics(election=None):
+    columns = precincts._count_columns(_precincts(data_store.election_id(election)).columns)
+    return ["Počet potvrdených okrskových zápisníc", *[c for c in columns if c != "Počet potvrdených okrskových zápisníc"], PARTY_VOTES]
+
+
+# Priradenie okrskov k útvarom úrovne: kódy útvarov (zoradené) a index útvaru pre každý okrsok
+@functools.lru_cache(maxsize=None)
+def _groups(level, election):
+    codes, inverse = np.unique(_precincts(election)[LEVELS[level][0]].to_numpy("int64"), return_inverse=True)
+    return codes, inverse
+
+
+# Index hierarchie: pre každý útvar úrovne jeho kód, názov a kódy a názvy nadradených útvarov
+@functools.lru_cache(maxsize=None)
+def _hierarchy(level, election):
+    names = list(LEVELS)
+    columns = [column for name in names[:names.index(level) + 1] for column in LEVELS[name]]
+    if level == "okrsok":
+        columns.insert(columns.index("Kód okrsku"), "Okrsok")
+        columns = list(dict.fromkeys(columns))
+    codes = [LEVELS[name][0] for name in names[:names.index(level) + 1]]
+    df = _precincts(election)[columns].drop_duplicates(LEVELS[level][0]).sort_values(codes)
+    return df.set_index(df[LEVELS[level][0]].rename(None))
+
+
+def hierarchy(level, election=None):
+    return _hierarchy(level, data_store.election_id(election))
+
+
+def _mask(filter, election):
+    if filter is None:
+        return None
+    level, code = filter
+    return _precincts(election)[LEVELS[level][0]].to_numpy() == code
+
+
+def _compute(level, metric, filter, election):
+    codes, inverse = _groups(level, election)
+    mask = _mask(filter, election)
+
+    if metric == PARTY_VOTES:
+        rows, columns, values, parties = _party_votes(election)
+        if mask is not None:
+            keep = mask[rows]
+            rows, columns, values = rows[keep], columns[keep], values[keep]
+        flat = inverse[rows] * len(parties) + columns
+        sums = np.bincount(flat, weights=values, minlength=len(codes) * len(parties))
+        result = pd.DataFrame(sums.reshape(len(codes), len(parties)).astype("int64"), index=codes, columns=parties)
+    else:
+        values = _precincts(election)[metric].to_numpy("int64")
+        groups = inverse
+        if mask is not None:
+            groups, values = groups[mask], values[mask]
+        result = pd.Series(np.bincount(groups, weights=values, minlength=len(codes)).astype("int64"), index=codes, name=metric)
+
+    if mask is not None:
+        result = result[np.bincount(inverse[mask], minlength=len(codes)) > 0]
+    result.index.name = LEVELS[level][0]
+    return result
+
+
+# Súčet ukazovateľa za útvary úrovne; filter = (úroveň, kód) obmedzí výpočet na jeden nadradený útvar.
+# Výsledok sa počíta len raz, ďalšie dopyty s rovnakým kľúčom ho vrátia z pamäte.
+def rollup(level, metric=PARTY_VOTES, filter=None, election=None):
+    if level not in LEVELS:
+        raise KeyError(f"Neznáma úroveň: {level}")
+    if filter is not None and filter[0] not in LEVELS:
+        raise KeyError(f"Neznáma úroveň filtra: {filter[0]}")
+    election = data_store.election_id(election)
+    key = (level, metric, filter, election)
+    with _lock:
+        if key not in _results:
+            _results[key] = _compute(level, metric, filter, election)
+        return _results[key].copy(deep=False)
+
+
+# Podiel v % na dve desatinné miesta; zdrojové tabuľky desatinné miesta odrezávajú, nezaokrúhľujú
+def _share(numerator, denominator):
+    return (10000 * numerator // denominator.where(denominator > 0)) / 100
+
+
+# Súhrnné výsledky hlasovania za úroveň v tvare tabuliek tab02a–tab02e
+def summary_table(level, filter=None, election=None):
+    df = hierarchy(level, election).copy()
+    summed = metrics(election)[:-1]
+    for metric in summed:
+        df[metric] = rollup(level, metric, filter, election)
+    df = df.dropna(subset=[summed[0]]).astype({metric: "int64" for metric in summed})
+
+    # Počet zapísaných voličov v cudzine nie je v okrskových zápisniciach (sčíta sa ako 0,
+    # účasť sa preto nevypočíta)
+    df["Účasť voličov v %"] = _share(df["Počet zúčastnených voličov"], df["Počet zapísaných voličov"])
+    df["Podiel odovzdaných obálok v %"] = _share(df["Počet odovzdaných obálok na hlasovanie"], df["Počet zúčastnených voličov"])
+    df["Podiel platných hlasov spolu v %"] = _share(df["Počet platných hlasov spolu"], df["Počet zúčastnených voličov"])
+    return df.reset_index(drop=True)
+
+
+# Hlasy pre subjekty za úroveň v dlhom tvare tabuliek tab03b–tab03f (bez prednostných hlasov,
+# ktoré sa v okrskových tabuľkách nenachádzajú); riadky s nulovým počtom hlasov sa vynechajú
+def party_table(level, filter=None, election=None):
+    votes_wide = rollup(level, PARTY_VOTES, filter, election)
+    totals = rollup(level, "Počet platných hlasov spolu", filter, election)
+
+    long = votes_wide.stack().rename(PARTY_VOTES).reset_index()
+    long.columns = [LEVELS[level][0], "Číslo politického subjektu", PARTY_VOTES]
+    long = long[long[PARTY_VOTES] > 0]
+
+    parties = data_store.get_table("tab0a", ["Číslo politického subjektu", "Názov politického subjektu"], election)
+    long = long.merge(parties, on="Číslo politického subjektu", how="left")
+    long["Podiel platných hlasov v %"] = _share(long[PARTY_VOTES], long[LEVELS[level][0]].map(totals))
+
+    areas = hierarchy(level, election).reset_index(drop=True)
+    areas["Poradie útvaru"] = np.arange(len(areas))
+    df = areas.merge(long, on=LEVELS[level][0]).sort_values(["Poradie útvaru", "Číslo politického subjektu"])
+    columns = [*hierarchy(level, election).columns, "Číslo politického subjektu", "Názov politického subjektu", PARTY_VOTES, "Podiel platných hlasov v %"]
+    return df[columns].reset_index(drop=True)
+
+
+# Tabuľka podľa kódu (napr. "tab03e") zostavená agregáciou okrskov
+def table(code, filter=None, election=None):
+    if code in SUMMARY_TABLES:
+        return summary_table(SUMMARY_TABLES[code], filter, election)
+    if code in PARTY_TABLES:
+        return party_table(PARTY_TABLES[code], filter, election)
+    raise KeyError(f"Tabuľku {code} nie je možné zostaviť agregáciou")
+
+
+def clear():
+    with _lock:
+        _results.clear()
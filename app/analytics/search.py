@@ -0,0 +1,128 @@
+import bisect
+import functools
+import re
+import unicodedata
+import numpy as np
+import data_store
+
+# Vyhľadávanie kandidátov: invertovaný index slov z mena, priezviska, zamestnania a obce
+# trvalého pobytu (bez diakritiky, malými písmenami). Slovo dopytu sa zhoduje presne,
+# ako začiatok slova alebo s jedným preklepom (index variantov s jedným vynechaným znakom).
+# Index sa vytvára pre každé voľby zvlášť (election = ID volieb, None = predvolené).
+
+FIELDS = ["Meno", "Priezvisko", "Zamestnanie", "Obec trvalého pobytu"]
+
+# Preklepy sa tolerujú len pri slovách s aspoň toľkými znakmi
+FUZZY_MIN_LENGTH = 4
+
+# Body za zhodu slova dopytu
+SCORES = {"exact": 3, "prefix": 2, "fuzzy": 1}
+
+_TOKEN = re.compile(r"\w+")
+
+
+# Text bez diakritiky a malými písmenami
+def normalize(text):
+    decomposed = unicodedata.normalize("NFKD", str(text))
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text):
+    return _TOKEN.findall(normalize(text))
+
+
+# Varianty slova s jedným vynechaným znakom
+def _deletes(token):
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+# Kandidáti (tab0b) s počtom prednostných hlasov a poznámkou o zvolení z tab07a
+def candidates(election=None):
+    df = data_store.get_table("tab0b", election=election)
+    votes = data_store.get_table("tab07a", ["Číslo politického subjektu", "Poradie na hlasovacom lístku",
+                                            "Počet platných prednostných hlasov", "Poznámka"], election)
+    votes = votes.rename(columns={"Poznámka": "Výsledok"})
+    df = df.merge(votes, on=["Číslo politického subjektu", "Poradie na hlasovacom lístku"], how="left")
+    df["Celé meno"] = df["Meno"].astype(str) + " " + df["Priezvisko"].astype(str)
+    return df
+
+
+# Index: zoradený slovník slov, pozície kandidátov pre každé slovo a varianty pre preklepy
+@functools.lru_cache(maxsize=data_store.MAX_LOADED_ELECTIONS)
+def _index(election):
+    df = candidates(election)
+    postings = {}
+    for field in FIELDS:
+        for row, text in enumerate(df[field].astype(str)):
+            for token in tokenize(text):
+                postings.setdefault(token, set()).add(row)
+
+    vocabulary = sorted(postings)
+    postings = {token: np.fromiter(sorted(rows), dtype="int64") for token, rows in postings.items()}
+    deletes = {}
+    for token in vocabulary:
+        if len(token) >= FUZZY_MIN_LENGTH:
+            for variant in _deletes(token) | {token}:
+                deletes.setdefault(variant, []).append(token)
+
+    votes = df["Počet platných prednostných hlasov"].fillna(0).to_numpy("int64")
+    return df, vocabulary, postings, deletes, votes
+
+
+# Slová slovníka zodpovedajúce slovu dopytu a druh zhody
+def _matches(token, vocabulary, deletes):
+    matches = {}
+    start = bisect.bisect_left(vocabulary, token)
+    end = bisect.bisect_left(vocabulary, token + "\uffff")
+    for word in vocabulary[start:end]:
+        matches[word] = "exact" if word == token else "prefix"
+
+    if len(token) >= FUZZY_MIN_LENGTH:
+        for variant in _deletes(token) | {token}:
+            for word in deletes.get(variant, ()):
+                matches.setdefault(word, "fuzzy")
+    return matches
+
+
+# Skóre každého kandidáta pre jedno slovo dopytu (0 = bez zhody)
+def _token_scores(token, index):
+    df, vocabulary, postings, deletes, votes = index
+    scores = np.zeros(len(df), dtype="int64")
+    for word, kind in _matches(token, vocabulary, deletes).items():
+        rows = postings[word]
+        scores[rows] = np.maximum(scores[rows], SCORES[kind])
+    return scores
+
+
+# Vyhľadanie kandidátov: všetky slová dopytu sa musia zhodovať; výsledky sú zoradené
+# podľa skóre a pri rovnosti podľa počtu prednostných hlasov
+def search(query, limit=10, election=None):
+    index = _index(data_store.election_id(election))
+    df, votes = index[0], index[4]
+    tokens = tokenize(query)
+    if not tokens:
+        return df.iloc[:0]
+
+    total = _token_scores(tokens[0], index)
+    for token in tokens[1:]:
+        scores = _token_scores(token, index)
+        total = np.where((total > 0) & (scores > 0), total + scores, 0)
+
+    hits = np.flatnonzero(total)
+    order = np.lexsort((-votes[hits], -total[hits]))[:limit]
+    return df.iloc[hits[order]]
+
+
+# Údaje jedného kandidáta podľa indexu riadku z výsledkov vyhľadávania; hodnota prichádza
+# od klienta, pri neznámom alebo neplatnom indexe sa vráti None
+def candidate(row, election=None):
+    df = _index(data_store.election_id(election))[0]
+    try:
+        return df.loc[int(row)]
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+# Vytvorenie indexu vopred, aby prvý dopyt nečakal na jeho zostavenie
+def prepare(election=None):
+    _index(data_store.election_id(election))
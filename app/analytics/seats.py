@@ -0,0 +1,113 @@
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+import data_store
+
+# Prideľovanie mandátov podľa zákona o voľbách: republikové volebné číslo (RVČ),
+# mandáty podľa RVČ a zvyšné mandáty podľa najväčších zostatkov. Výpočet pracuje
+# s dávkami – riadok matice hlasov je jeden scenár, stĺpec jeden politický subjekt.
+
+SEATS = 150
+
+# Kvórum v % z celkového počtu platných hlasov (subjekt 5 %, koalícia 2–3 strán 7 %, väčšia 10 %)
+THRESHOLD = 5.0
+
+Allocation = namedtuple("Allocation", [
+    "rvc", "advancing", "quotient_seats", "remainders", "deducted_seats", "remainder_seats", "seats"
+])
+
+
+# Poradie v rámci riadku podľa kľúča (vzostupne), zhody rozhoduje druhý kľúč
+def _row_ranks(key, tiebreak):
+    order = np.lexsort((tiebreak, key), axis=-1)
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(order.shape[-1]), axis=-1)
+    return ranks
+
+
+# Pridelenie mandátov pre maticu hlasov (scenáre × subjekty). Celkový počet platných hlasov
+# (základ pre kvórum) je súčet riadku, ak sa nezadá inak; threshold môže byť aj pole pre
+# jednotlivé subjekty.
+def allocate(votes, total_valid=None, seats=SEATS, threshold=THRESHOLD):
+    votes = np.asarray(votes, dtype="int64")
+    single = votes.ndim == 1
+    votes = np.atleast_2d(votes)
+    total_valid = votes.sum(axis=1) if total_valid is None else np.broadcast_to(np.asarray(total_valid, dtype="int64"), votes.shape[:1])
+
+    advancing = (votes > 0) & (votes * 100 >= np.asarray(threshold) * total_valid[:, None])
+    advancing_votes = np.where(advancing, votes, 0)
+
+    # RVČ: súčet hlasov postupujúcich subjektov delený počtom mandátov zväčšeným o 1, zaokrúhlený nahor
+    advancing_total = advancing_votes.sum(axis=1)
+    rvc = -(-advancing_total // (seats + 1))
+    divisor = np.maximum(rvc, 1)[:, None]
+    quotient_seats = advancing_votes // divisor
+    remainders = advancing_votes - quotient_seats * divisor
+    missing = seats - quotient_seats.sum(axis=1)
+
+    # Chýbajúce mandáty dostanú subjekty s najväčším zostatkom (pri zhode väčší počet hlasov)
+    by_remainder = _row_ranks(np.where(advancing, -remainders, 1), -advancing_votes)
+    remainder_seats = (advancing & (by_remainder < np.maximum(missing, 0)[:, None])).astype("int64")
+
+    # Ak sa pridelí viac mandátov, odpočítajú sa subjektom s najmenším zostatkom
+    by_smallest = _row_ranks(np.where(advancing, remainders, np.iinfo("int64").max), advancing_votes)
+    deducted_seats = (advancing & (by_smallest < np.maximum(-missing, 0)[:, None])).astype("int64")
+
+    result = Allocation(
+        rvc=rvc,
+        advancing=advancing,
+        quotient_seats=quotient_seats,
+        remainders=remainders,
+        deducted_seats=deducted_seats,
+        remainder_seats=remainder_seats,
+        seats=quotient_seats - deducted_seats + remainder_seats,
+    )
+    if single:
+        return Allocation(*[value[0] for value in result])
+    return result
+
+
+# Hlasy subjektov za SR z tab03a (v poradí čísel subjektov)
+def national_votes(election=None):
+    return data_store.get_table("tab03a", ["Číslo politického subjektu", "Názov politického subjektu", "Počet platných hlasov"], election)
+
+
+# Výsledok prideľovania v tvare tabuľky tab04 (len subjekty, ktoré postúpili)
+def allocation_table(votes_df=None, seats=SEATS, threshold=THRESHOLD, election=None):
+    df = national_votes(election) if votes_df is None else votes_df
+    result = allocate(df["Počet platných hlasov"].to_numpy(), seats=seats, threshold=threshold)
+
+    candidates = data_store.get_table("tab0a", ["Číslo politického subjektu", "Počet kandidátov"], election)
+    table = df[["Číslo politického subjektu", "Názov politického subjektu"]].merge(candidates, on="Číslo politického subjektu", how="left")
+    table["Počet platných hlasov"] = df["Počet platných hlasov"].to_numpy()
+    table["Počet mandátov vzhľadom na RVČ"] = result.quotient_seats
+    table["Zostatok platných hlasov po delení RVČ"] = result.remainders
+    table["Odpočítané mandáty"] = result.deducted_seats
+    table["Mandáty pridelené na základe zostatku platných hlasov"] = result.remainder_seats
+    table["Pridelené mandáty spolu"] = result.seats
+    return table[result.advancing].reset_index(drop=True)
+
+
+# Súhrnné údaje v tvare tabuľky tab04x
+def allocation_summary(votes_df=None, seats=SEATS, threshold=THRESHOLD, election=None):
+    df = national_votes(election) if votes_df is None else votes_df
+    result = allocate(df["Počet platných hlasov"].to_numpy(), seats=seats, threshold=threshold)
+    return pd.DataFrame({
+        "Súčet platných hlasov odovzdaných pre postupujúce politické subjekty": [int(df["Počet platných hlasov"].to_numpy()[result.advancing].sum())],
+        "Počet mandátov v NR SR (zákonom stanovený počet)": [seats],
+        "Republikové volebné číslo (RVČ)": [int(result.rvc)],
+    })
+
+
+# Kontrola výpočtu voči zverejneným tabuľkám tab04 a tab04x; vráti zoznam rozdielnych stĺpcov
+def check_against_tab04(election=None):
+    differences = []
+    for computed, published in [(allocation_table(election=election), data_store.get_table("tab04", election=election)),
+                                (allocation_summary(election=election), data_store.get_table("tab04x", election=election))]:
+        if len(computed) != len(published):
+            differences.append("počet riadkov")
+            continue
+        for column in published.columns:
+            if not np.array_equal(computed[column].astype(str).to_numpy(), published[column].astype(str).to_numpy()):
+                differences.append(column)
+    return differences
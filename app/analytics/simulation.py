@@ -0,0 +1,94 @@
+import atexit
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from analytics import seats
+
+# Simulácia neistoty výsledku: podiely hlasov sa náhodne rozkolíšu (Dirichletovo rozdelenie
+# okolo zadaných podielov) a pre každý ťah sa pridelia mandáty. Ťahy sa počítajú po dávkach
+# v procesoch na pozadí, výsledok je histogram počtu mandátov pre každý subjekt.
+
+DRAWS = 20000
+CHUNK_SIZE = 5000
+SEED = 2023
+
+# Koncentrácia Dirichletovho rozdelenia: čím väčšia, tým menší rozptyl podielov
+# (pri 1000 je smerodajná odchýlka podielu 20 % približne 1,3 percentuálneho bodu)
+UNCERTAINTY = {
+    "nízka": 5000,
+    "stredná": 1000,
+    "vysoká": 300,
+}
+
+WORKERS = int(os.environ.get("SIMULATION_WORKERS", min(4, os.cpu_count() or 1)))
+
+# Pri menšom počte ťahov je réžia procesov väčšia ako zisk, simulácia beží v hlavnom procese
+PARALLEL_MIN_DRAWS = int(os.environ.get("SIMULATION_PARALLEL_MIN_DRAWS", 100000))
+
+# Procesy sa nevytvárajú cez fork: server Dash beží vo viacerých vláknach (Flask, sledovač
+# priebežných výsledkov, kanál udalostí) a fork viacvláknového procesu môže uviaznuť
+START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=WORKERS, mp_context=multiprocessing.get_context(START_METHOD))
+            atexit.register(_pool.shutdown, cancel_futures=True)
+        return _pool
+
+
+# Počty hlasov zo zadaných podielov (v %) pri danom celkovom počte platných hlasov
+def votes_from_shares(shares, total_valid):
+    shares = np.asarray(shares, dtype="float64")
+    return np.rint(shares / shares.sum() * total_valid).astype("int64")
+
+
+# Jedna dávka ťahov: histogram mandátov (subjekty × 0..SEATS) a počet ťahov so vstupom do parlamentu
+def _simulate_chunk(shares, concentration, draws, total_valid, threshold, seed):
+    rng = np.random.default_rng(seed)
+    alpha = np.maximum(np.asarray(shares) / 100 * concentration, 1e-3)
+    drawn = rng.dirichlet(alpha, size=draws)
+    votes = np.rint(drawn * total_valid).astype("int64")
+    result = seats.allocate(votes, total_valid=np.full(draws, total_valid), threshold=threshold)
+
+    parties = result.seats.shape[1]
+    flat = np.arange(parties) * (seats.SEATS + 1) + result.seats
+    histogram = np.bincount(flat.ravel(), minlength=parties * (seats.SEATS + 1)).reshape(parties, seats.SEATS + 1)
+    return histogram, result.advancing.sum(axis=0)
+
+
+# Histogram mandátov pre sadu parametrov; výsledok sa uchová pre rovnaké parametre
+# (shares musí byť n-tica, aby sa dala použiť ako kľúč)
+@functools.lru_cache(maxsize=64)
+def simulate(shares, total_valid, threshold=seats.THRESHOLD, uncertainty="stredná", draws=DRAWS):
+    concentration = UNCERTAINTY[uncertainty]
+    chunks = [min(CHUNK_SIZE, draws - start) for start in range(0, draws, CHUNK_SIZE)]
+    seeds = np.random.SeedSequence(SEED).spawn(len(chunks))
+    args = [(shares, concentration, size, total_valid, threshold, seed) for size, seed in zip(chunks, seeds)]
+
+    if len(chunks) == 1 or WORKERS <= 1 or draws < PARALLEL_MIN_DRAWS:
+        parts = [_simulate_chunk(*arg) for arg in args]
+    else:
+        parts = list(_get_pool().map(_simulate_chunk, *zip(*args)))
+
+    histogram = sum(part[0] for part in parts)
+    advancing = sum(part[1] for part in parts)
+    return histogram, advancing / draws
+
+
+# Súhrn histogramu: priemer a kvantily počtu mandátov pre každý subjekt
+def summarize(histogram, quantiles=(0.05, 0.5, 0.95)):
+    counts = np.arange(histogram.shape[1])
+    draws = histogram.sum(axis=1)
+    mean = (histogram * counts).sum(axis=1) / draws
+    cumulative = np.cumsum(histogram, axis=1) / draws[:, None]
+    values = {q: (cumulative < q).sum(axis=1) for q in quantiles}
+    return mean, values
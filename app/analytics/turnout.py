@@ -0,0 +1,145 @@
+import functools
+import numpy as np
+import pandas as pd
+import data_store
+
+# Analýza volebnej účasti v obciach (tab02d) a okrskoch (tab02e). Pre každú úroveň
+# a spôsob zoskupenia sa raz vytvorí poradie útvarov podľa účasti (v rámci skupiny),
+# takže percentily, najnižšie/najvyššie hodnoty a výbery pre jeden kraj či okres
+# sú len výrezy zoradeného poľa. Všetky dopyty berú voliteľné ID volieb (election);
+# vyrovnávacie pamäte sú kľúčované podľa neho.
+
+TURNOUT = "Účasť voličov v %"
+
+LEVELS = {
+    "obec": "tab02d",
+    "okrsok": "tab02e",
+}
+
+# Skupiny, v rámci ktorých sa dajú dopyty obmedziť
+GROUPS = {
+    "kraj": "Kód kraja",
+    "obvod": "Kód územného obvodu",
+    "okres": "Kód okresu",
+    "obec": "Kód obce",
+}
+
+COLUMNS = ["Kód kraja", "Názov kraja", "Kód územného obvodu", "Názov územného obvodu", "Kód okresu",
+           "Názov okresu", "Kód obce", "Názov obce", "Okrsok", "Počet zapísaných voličov",
+           "Počet zúčastnených voličov", TURNOUT]
+
+# Percentily uložené v náčrte rozdelenia každej skupiny
+SKETCH_PERCENTILES = np.arange(0, 101)
+
+# Hranica z-skóre pre odľahlé hodnoty v rámci okresu
+OUTLIER_Z = 2.5
+
+
+# Útvary úrovne s účasťou a z-skóre účasti v rámci okresu (bez cudziny)
+@functools.lru_cache(maxsize=None)
+def _table(level, election):
+    df = data_store.get_table(LEVELS[level], election=election)
+    df = df[[column for column in COLUMNS if column in df.columns]]
+    df = df[(df["Názov kraja"] != "Cudzina") & df[TURNOUT].notna()].reset_index(drop=True)
+
+    by_district = df.groupby("Kód okresu")[TURNOUT]
+    std = by_district.transform("std", ddof=0)
+    df["Z-skóre v okrese"] = ((df[TURNOUT] - by_district.transform("mean")) / std.where(std > 0)).round(2)
+    return df
+
+
+def table(level, election=None):
+    return _table(level, data_store.election_id(election))
+
+
+# Poradie útvarov podľa účasti vzostupne, zoskupené podľa skupiny; pre každú skupinu výrez poradia
+@functools.lru_cache(maxsize=None)
+def _sorted_index(level, group, election):
+    df = _table(level, election)
+    turnout = df[TURNOUT].to_numpy()
+    if group is None:
+        order = np.argsort(turnout, kind="stable")
+        return order, {None: order}
+
+    codes = df[GROUPS[group]].to_numpy("int64")
+    order = np.lexsort((turnout, codes))
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    ends = np.r_[starts[1:], len(order)]
+    return order, {int(sorted_codes[start]): order[start:end] for start, end in zip(starts, ends)}
+
+
+# Pozície útvarov skupiny zoradené podľa účasti; where = (skupina, kód) alebo None pre celú SR.
+# Neznámy kód skupiny (alebo skupina bez útvarov) dá prázdny výber.
+def _positions(level, where, election):
+    if level not in LEVELS:
+        raise KeyError(f"Neznáma úroveň: {level}")
+    if where is None:
+        return _sorted_index(level, None, election)[1][None]
+    group, code = where
+    if group not in GROUPS:
+        raise KeyError(f"Neznáma skupina: {group}")
+    return _sorted_index(level, group, election)[1].get(int(code), np.array([], dtype="int64"))
+
+
+def values(level, where=None, election=None):
+    election = data_store.election_id(election)
+    positions = _positions(level, where, election)
+    return _table(level, election)[TURNOUT].to_numpy()[positions]
+
+
+# Percentily účasti (q v rozsahu 0–100) zo zoradených hodnôt; pre prázdny výber NaN
+def percentiles(level, q, where=None, election=None):
+    selected = values(level, where, election)
+    if not len(selected):
+        return np.full(np.shape(q), np.nan)
+    return np.percentile(selected, q, method="linear")
+
+
+def histogram(level, bins=20, where=None, range=(0, 100), election=None):
+    return np.histogram(values(level, where, election), bins=bins, range=range)
+
+
+# k útvarov s najnižšou účasťou
+def lowest(level, k=10, where=None, election=None):
+    election = data_store.election_id(election)
+    positions = _positions(level, where, election)
+    return _table(level, election).iloc[positions[:k]]
+
+
+# k útvarov s najvyššou účasťou
+def highest(level, k=10, where=None, election=None):
+    election = data_store.election_id(election)
+    positions = _positions(level, where, election)
+    return _table(level, election).iloc[positions[::-1][:k]]
+
+
+# Útvary, ktorých účasť sa od priemeru okresu líši o viac ako threshold smerodajných odchýlok
+def outliers(level, threshold=OUTLIER_Z, where=None, election=None):
+    election = data_store.election_id(election)
+    positions = _positions(level, where, election)
+    df = _table(level, election).iloc[positions]
+    df = df[df["Z-skóre v okrese"].abs() >= threshold]
+    return df.sort_values("Z-skóre v okrese", key=np.abs, ascending=False)
+
+
+# Náčrt rozdelenia účasti pre každú skupinu: percentily 0–100 (riadok = kód skupiny)
+@functools.lru_cache(maxsize=None)
+def _quantile_sketch(level, group, election):
+    if group not in GROUPS:
+        raise KeyError(f"Neznáma skupina: {group}")
+    turnout = _table(level, election)[TURNOUT].to_numpy()
+    sketch = {code: np.percentile(turnout[positions], SKETCH_PERCENTILES) for code, positions in _sorted_index(level, group, election)[1].items()}
+    return pd.DataFrame.from_dict(sketch, orient="index", columns=SKETCH_PERCENTILES).rename_axis(GROUPS[group])
+
+
+def quantile_sketch(level, group="okres", election=None):
+    return _quantile_sketch(level, group, data_store.election_id(election))
+
+
+# Približný percentil z náčrtu (bez prístupu k jednotlivým útvarom)
+def sketch_percentile(level, group, code, q, election=None):
+    sketch = quantile_sketch(level, group, election)
+    if code not in sketch.index:
+        return float("nan")
+    return float(np.interp(q, SKETCH_PERCENTILES, sketch.loc[code].to_numpy()))
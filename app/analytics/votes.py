@@ -0,0 +1,148 @@
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+import data_store
+from analytics import precincts
+
+# Prevod tabuliek s horizontálnym pohľadom (tab08a–tab08e) do kompaktnej dlhej podoby.
+# Ukladajú sa len nenulové počty hlasov ako celočíselné polia zoradené podľa útvaru
+# (podobne ako riadky riedkej matice CSR); podiely v % sa dopočítavajú na požiadanie.
+
+VOTES_PREFIX = "Počet platných hlasov za "
+
+# Stĺpec s kódom útvaru pre jednotlivé úrovne
+AREA_KEYS = {
+    "tab08a": "Kód kraja",
+    "tab08b": "Kód územného obvodu",
+    "tab08c": "Kód okresu",
+    "tab08d": "Kód obce",
+}
+
+# area_codes – kód útvaru pre každý riadok, totals – platné hlasy spolu v útvare,
+# offsets – hlasy útvaru i sú v rozsahu offsets[i]:offsets[i + 1] polí party_ids a votes,
+# area_order – poradie riadkov podľa kódu útvaru na vyhľadávanie útvaru binárnym delením
+PartyVotes = namedtuple("PartyVotes", ["area_codes", "totals", "offsets", "party_ids", "votes", "parties", "area_order"])
+
+
+# Čísla subjektov podľa skratky použitej v názvoch stĺpcov
+def _party_numbers(election=None):
+    parties = data_store.get_table("tab0a", election=election)
+    return dict(zip(parties["Skratka politického subjektu"].astype(str), parties["Číslo politického subjektu"]))
+
+
+# Kód okrsku je zložený z kódu obce a čísla okrsku (číslo okrsku je menšie ako 1000)
+def _area_codes(df, code):
+    if code == "tab08e":
+        return df["Kód obce"].to_numpy("int64") * 1000 + df["Okrsok"].to_numpy("int64")
+    if code in AREA_KEYS:
+        return df[AREA_KEYS[code]].to_numpy("int64")
+    return np.arange(len(df), dtype="int64")
+
+
+def _area_order(area_codes):
+    return np.argsort(area_codes, kind="stable")
+
+
+# Vektorizovaný prevod jednej širokej tabuľky (alebo dávky) do riedkej podoby
+def from_wide(df, code, election=None):
+    numbers = _party_numbers(election)
+    columns = [column for column in df.columns if column.startswith(VOTES_PREFIX)]
+    column_party_ids = np.array([numbers[column[len(VOTES_PREFIX):]] for column in columns], dtype="int16")
+
+    matrix = df[columns].to_numpy("float64")
+    matrix = np.nan_to_num(matrix, nan=0.0).astype("int32")
+    rows, cols = np.nonzero(matrix)
+
+    offsets = np.zeros(len(df) + 1, dtype="int64")
+    np.cumsum(np.bincount(rows, minlength=len(df)), out=offsets[1:])
+
+    area_codes = _area_codes(df, code)
+    return PartyVotes(
+        area_codes=area_codes,
+        totals=df["Počet platných hlasov spolu"].to_numpy("int64"),
+        offsets=offsets,
+        party_ids=column_party_ids[cols],
+        votes=matrix[rows, cols],
+        parties=np.sort(column_party_ids),
+        area_order=_area_order(area_codes),
+    )
+
+
+# Spojenie viacerých riedkych častí (napr. dávok okrskov) do jednej
+def concat(parts):
+    offsets = [np.zeros(1, dtype="int64")]
+    shift = 0
+    for part in parts:
+        offsets.append(part.offsets[1:] + shift)
+        shift += part.offsets[-1]
+    area_codes = np.concatenate([part.area_codes for part in parts])
+    return PartyVotes(
+        area_codes=area_codes,
+        totals=np.concatenate([part.totals for part in parts]),
+        offsets=np.concatenate(offsets),
+        party_ids=np.concatenate([part.party_ids for part in parts]),
+        votes=np.concatenate([part.votes for part in parts]),
+        parties=parts[0].parties,
+        area_order=_area_order(area_codes),
+    )
+
+
+# Dlhá podoba tabuľky tab08*; okrsková úroveň sa číta prúdovo po dávkach
+def load(code, election=None):
+    if code == "tab08e":
+        return concat([from_wide(batch, code, election)
+                       for batch in precincts.read_batches(data_store.table_path(code, election))])
+    return from_wide(data_store.get_table(code, election=election), code, election)
+
+
+# Pozícia útvaru podľa jeho kódu (binárne vyhľadávanie v poradí area_order)
+def area_position(party_votes, area_code):
+    order = party_votes.area_order
+    i = np.searchsorted(party_votes.area_codes, area_code, sorter=order)
+    if i == len(order) or party_votes.area_codes[order[i]] != area_code:
+        raise KeyError(area_code)
+    return order[i]
+
+
+# Hlasy jedného útvaru: (čísla subjektov, počty hlasov) ako výrez polí
+def area_votes(party_votes, area_code):
+    i = area_position(party_votes, area_code)
+    start, end = party_votes.offsets[i], party_votes.offsets[i + 1]
+    return party_votes.party_ids[start:end], party_votes.votes[start:end]
+
+
+# Index útvaru pre každý nenulový záznam
+def _row_index(party_votes):
+    return np.repeat(np.arange(len(party_votes.area_codes)), np.diff(party_votes.offsets))
+
+
+# Hlasy jedného subjektu vo všetkých útvaroch (husté pole v poradí area_codes)
+def party_votes_by_area(party_votes, party_id):
+    mask = party_votes.party_ids == party_id
+    result = np.zeros(len(party_votes.area_codes), dtype="int64")
+    result[_row_index(party_votes)[mask]] = party_votes.votes[mask]
+    return result
+
+
+# Podiely platných hlasov v % pre všetky nenulové záznamy (odrezané na dve desatinné
+# miesta rovnako ako v zdrojových tabuľkách)
+def shares(party_votes):
+    totals = party_votes.totals[_row_index(party_votes)]
+    return (10000 * party_votes.votes.astype("int64") // totals) / 100
+
+
+# Hustá matica hlasov (útvary × subjekty v poradí parties)
+def to_dense(party_votes):
+    columns = np.searchsorted(party_votes.parties, party_votes.party_ids)
+    matrix = np.zeros((len(party_votes.area_codes), len(party_votes.parties)), dtype="int64")
+    matrix[_row_index(party_votes), columns] = party_votes.votes
+    return matrix
+
+
+# Prevod do dlhej tabuľky pandas (kód útvaru, číslo subjektu, počet hlasov)
+def to_frame(party_votes):
+    return pd.DataFrame({
+        "Kód útvaru": party_votes.area_codes[_row_index(party_votes)],
+        "Číslo politického subjektu": party_votes.party_ids,
+        "Počet platných hlasov": party_votes.votes,
+    })
@@ -1,7 +1,9 @@
 import dash
 import dash_bootstrap_components as dbc
-from dash import dcc, html, Input, Output
-from pages import page_1, page_2, page_3, page_4, page_5, page_6
+from dash import dcc, html, Input, Output, State, ALL, MATCH, ctx
+import page_registry
+import push
+from analytics import live
 from dash.exceptions import PreventUpdate
 
 # Inicializácia aplikácie
@@ -36,15 +38,10 @@ app.layout = html.Div([
 )
 
 def update_navbar(pathname):
-    links = [
-        dbc.NavItem(dbc.NavLink("Domov", href=generate_url("home"), active="exact" if pathname == "/" else None)),
-        dbc.NavItem(dbc.NavLink("Strana 1", href=generate_url("page-1"), active="exact" if pathname == "/page-1" else None)),
-        dbc.NavItem(dbc.NavLink("Strana 2", href=generate_url("page-2"), active="exact" if pathname == "/page-2" else None)),
-        dbc.NavItem(dbc.NavLink("Strana 3", href=generate_url("page-3"), active="exact" if pathname == "/page-3" else None)),
-        dbc.NavItem(dbc.NavLink("Strana 4", href=generate_url("page-4"), active="exact" if pathname == "/page-4" else None)),
-        dbc.NavItem(dbc.NavLink("Strana 5", href=generate_url("page-5"), active="exact" if pathname == "/page-5" else None)),
-        dbc.NavItem(dbc.NavLink("Strana 6", href=generate_url("page-6"), active="exact" if pathname == "/page-6" else None)),
-    ]
+    links = [dbc.NavItem(dbc.NavLink("Domov", href=generate_url("home"), active="exact" if pathname == "/" else None))]
+    for i, (page_name, _) in enumerate(page_registry.PAGES, start=1):
+        href = generate_url(page_name)
+        links.append(dbc.NavItem(dbc.NavLink(f"Strana {i}", href=href, active="exact" if pathname == href else None)))
     return links
 
 # Funkcia na vytvorenie navigačných tlačidiel "Späť" a "Ďalej"
@@ -147,58 +144,174 @@ def display_page(pathname):
             ], style={'maxWidth': '900px', 'margin': 'auto'})
         ], style=styles['container'])
 
-    elif pathname == '/page-1':
+    page_name = pathname.lstrip('/') if pathname else None
+    page = page_registry.get_page(page_name)
+    if page is not None:
+        prev_page, next_page = page_registry.neighbours(page_name)
         return html.Div([
-            page_1.get_layout(),
-            navigation_buttons(next_page='page-2', prev_page='home')
+            page.get_layout(),
+            navigation_buttons(next_page=next_page, prev_page=prev_page)
         ])
 
-    elif pathname == '/page-2':
-        return html.Div([
-            page_2.get_layout(),
-            navigation_buttons(next_page='page-3', prev_page='page-1')
-        ])
-
-    elif pathname == '/page-3':
-        return html.Div([
-            page_3.get_layout(),
-            navigation_buttons(next_page='page-4', prev_page='page-2')
-        ])
-
-    elif pathname == '/page-4':
-        return html.Div([
-            page_4.get_layout(),
-            navigation_buttons(next_page='page-5', prev_page='page-3')
-        ])
+    return html.Div([html.H1("404: Stránka neexistuje")])
+    
 
-    elif pathname == '/page-5':
-        return html.Div([
-            page_5.get_layout(),
-            navigation_buttons(next_page='page-6', prev_page='page-4')
-        ])
+# Callback funkcia na stránkovanie a zoraďovanie tabuliek účasti na strane 2
+@app.callback(
+    Output({"type": "ucast-tabulka", "index": MATCH}, "data"),
+    Input({"type": "ucast-tabulka", "index": MATCH}, "page_current"),
+    Input({"type": "ucast-tabulka", "index": MATCH}, "page_size"),
+    Input({"type": "ucast-tabulka", "index": MATCH}, "sort_by"),
+    State({"type": "ucast-tabulka", "index": MATCH}, "id"),
+    prevent_initial_call=True
+)
+def strana_tabulky_ucasti(strana, velkost, zoradenie, identifikator):
+    return page_registry.get_page("page-2").strana_tabulky(identifikator["index"], strana, velkost, zoradenie)
 
-    elif pathname == '/page-6':
-        return html.Div([
-            page_6.get_layout(),
-            navigation_buttons(next_page=None, prev_page='page-5')  # posledná strana – bez ďalšieho odkazu
-        ])
+# Callback funkcia na rozdelenie volebnej účasti na strane 2 (voľby, úroveň a kraj)
+@app.callback(
+    Output("ucast-histogram", "figure"),
+    Output("ucast-najnizsie", "columns"),
+    Output("ucast-najnizsie", "data"),
+    Input("ucast-uroven", "value"),
+    Input("ucast-kraj", "value"),
+    Input("ucast-volby", "value")
+)
+def aktualizuj_rozdelenie_ucasti(uroven, kod_kraja, volby):
+    if not uroven:
+        raise PreventUpdate
+    return page_registry.get_page("page-2").vytvor_rozdelenie_ucasti(uroven, kod_kraja, volby)
 
-    else:
-        return html.Div([html.H1("404: Stránka neexistuje")])
-    
+# Po zmene volieb na strane 2 sa ponúknu ich kraje a výber kraja sa zruší
+@app.callback(
+    Output("ucast-kraj", "options"),
+    Output("ucast-kraj", "value"),
+    Input("ucast-volby", "value"),
+    prevent_initial_call=True
+)
+def aktualizuj_kraje_ucasti(volby):
+    return page_registry.get_page("page-2").moznosti_krajov(volby), None
 
 # Callback funkcia na aktualizáciu mapy a tabuliek na strane 3
 @app.callback(
-    Output("mapa-obrazok", "src"),
+    Output("mapa-graf", "figure"),
+    Output("mapa-png", "href"),
+    Output("mapa-png", "style"),
     Output("tabulky-kraje", "children"),
     Input("subjekt-dropdown", "value")
 )
 def aktualizuj_mapu_a_tabulky(subjekt):
     if not subjekt:
         raise PreventUpdate
-    mapa = page_3.zobraz_mapu(subjekt)
-    tabulky = page_3.vytvor_tabulky(subjekt)  
-    return mapa, tabulky
+    page_3 = page_registry.get_page("page-3")
+    mapa = page_3.aktualizuj_mapu(subjekt)
+    href, style = page_3.mapa_na_stiahnutie(subjekt)
+    tabulky = page_3.vytvor_tabulky(subjekt)
+    return mapa, href, style, tabulky
+
+# Callback funkcia na detailnú mapu na strane 7 (úroveň, subjekt a výrez mapy)
+@app.callback(
+    Output("detail-mapa", "figure"),
+    Input("detail-uroven", "value"),
+    Input("detail-subjekt", "value"),
+    Input("detail-mapa", "relayoutData")
+)
+def aktualizuj_detailnu_mapu(uroven, cislo, relayout):
+    if not uroven or cislo is None:
+        raise PreventUpdate
+    page_7 = page_registry.get_page("page-7")
+    bounds, zoom = page_7.vyrez_mapy(relayout)
+    # Udalosti bez zmeny výrezu (napr. autosize) mapu neprekresľujú
+    if ctx.triggered_id == "detail-mapa" and bounds is None:
+        raise PreventUpdate
+    return page_7.vytvor_mapu(uroven, cislo, bounds, zoom)
+
+# Callback funkcia na scenáre mandátov na strane 8 (podiely subjektov, kvórum a neistota simulácie)
+@app.callback(
+    Output("scenar-mandaty", "figure"),
+    Output("scenar-simulacia", "figure"),
+    Output("scenar-suhrn", "children"),
+    Input({"type": "scenar-podiel", "index": ALL}, "value"),
+    Input("scenar-kvorum", "value"),
+    Input("scenar-neistota", "value"),
+    State({"type": "scenar-podiel", "index": ALL}, "id")
+)
+def aktualizuj_scenar(hodnoty, kvorum, neistota, identifikatory):
+    if kvorum is None:
+        raise PreventUpdate
+    page_8 = page_registry.get_page("page-8")
+    podiely = page_8.podiely_scenara({i["index"]: h for i, h in zip(identifikatory, hodnoty)})
+    mandaty, suhrn = page_8.vytvor_graf_mandatov(podiely, kvorum)
+    simulacia = page_8.vytvor_graf_simulacie(podiely, kvorum, neistota)
+    return mandaty, simulacia, suhrn
+
+# Callback funkcia na návrhy vo vyhľadávaní kandidátov na strane 9 (pri každom stlačení klávesu)
+@app.callback(
+    Output("kandidat-hladanie", "options"),
+    Input("kandidat-hladanie", "search_value"),
+    State("kandidat-hladanie", "value")
+)
+def aktualizuj_navrhy(dopyt, vybrany):
+    if not dopyt and vybrany is None:
+        raise PreventUpdate
+    return page_registry.get_page("page-9").navrhy(dopyt, vybrany)
+
+# Callback funkcia na detail vybraného kandidáta na strane 9
+@app.callback(
+    Output("kandidat-detail", "children"),
+    Input("kandidat-hladanie", "value")
+)
+def zobraz_kandidata(vybrany):
+    return page_registry.get_page("page-9").detail_kandidata(vybrany)
+
+# Callback funkcia na krížové filtrovanie grafov na strane 10
+@app.callback(
+    Output({"type": "demografia-graf", "dim": ALL}, "figure"),
+    Output("demografia-suhrn", "children"),
+    Input({"type": "demografia-filter", "dim": ALL}, "value"),
+    State({"type": "demografia-filter", "dim": ALL}, "id"),
+    State({"type": "demografia-graf", "dim": ALL}, "id")
+)
+def aktualizuj_demografiu(hodnoty, filtre_id, grafy_id):
+    page_10 = page_registry.get_page("page-10")
+    filtre = page_10.filtre_z_hodnot(filtre_id, hodnoty)
+    return [page_10.vytvor_graf(i["dim"], filtre) for i in grafy_id], page_10.vytvor_suhrn(filtre)
+
+# Callback funkcia na výber hodnôt filtra kliknutím do grafu a na zrušenie filtrov na strane 10
+@app.callback(
+    Output({"type": "demografia-filter", "dim": ALL}, "value"),
+    Input({"type": "demografia-graf", "dim": ALL}, "clickData"),
+    Input("demografia-zrusit", "n_clicks"),
+    State({"type": "demografia-filter", "dim": ALL}, "value"),
+    State({"type": "demografia-filter", "dim": ALL}, "id"),
+    prevent_initial_call=True
+)
+def vyber_v_grafe(kliknutia, zrusit, hodnoty, filtre_id):
+    if ctx.triggered_id == "demografia-zrusit":
+        return [[] for _ in hodnoty]
+    if not isinstance(ctx.triggered_id, dict):
+        raise PreventUpdate
+    page_10 = page_registry.get_page("page-10")
+    dim = ctx.triggered_id["dim"]
+    kliknutie = ctx.triggered[0]["value"]
+    return [page_10.prepni_vyber(kliknutie, h) if i["dim"] == dim else h for i, h in zip(filtre_id, hodnoty)]
+
+# Zmeny priebežných výsledkov sa posielajú otvoreným stránkam cez kanál udalostí (strana 11)
+def posli_priebezne_vysledky(_):
+    stranka = page_registry.get_page("page-11")
+    push.publish(stranka.KANAL, stranka.stav_pre_klientov())
+
+push.register(app.server)
+live.subscribe(posli_priebezne_vysledky)
+
+# Sledovanie priečinka s priebežnými výsledkami (ak je nastavený LIVE_RESULTS_DIR); strana 11
+# sa vtedy načíta hneď, aby jej kanál existoval aj pre klientov, ktorí sa po reštarte servera
+# pripoja znova bez načítania stránky
+if live.start() is not None:
+    page_registry.get_page("page-11")
+
+# Stránky sa načítavajú lenivo; voliteľne sa predpripravia na pozadí
+page_registry.start_warm_up()
 
 # Spustenie aplikácie
 if __name__ == '__main__':
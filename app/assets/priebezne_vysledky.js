@@ -0,0 +1,52 @@
+// Priebežné výsledky (strana 11): server posiela cez Server-Sent Events len zmenené časti
+// stavu a grafy sa aktualizujú čiastočne (Plotly.restyle), bez nového vykreslenia stránky.
+(function () {
+    var zdroj = null;
+
+    function graf(id) {
+        var obal = document.getElementById(id);
+        return obal && obal.querySelector('.js-plotly-plot');
+    }
+
+    function aktualizujGraf(id, zmena) {
+        var g = graf(id);
+        if (!g || !window.Plotly) {
+            return;
+        }
+        window.Plotly.restyle(g, zmena.data, [0]);
+        if (zmena.layout && zmena.layout.height) {
+            window.Plotly.relayout(g, zmena.layout);
+        }
+    }
+
+    function aplikuj(zmeny) {
+        if (zmeny.podiely) {
+            aktualizujGraf('live-podiely', zmeny.podiely);
+        }
+        if (zmeny.mandaty) {
+            aktualizujGraf('live-mandaty', zmeny.mandaty);
+        }
+        if (zmeny.stav !== undefined) {
+            window.dash_clientside.set_props('live-stav', {children: zmeny.stav});
+        }
+        if (zmeny.kraje) {
+            window.dash_clientside.set_props('live-kraje', {data: zmeny.kraje});
+        }
+    }
+
+    // Spojenie sa otvorí, keď je strana 11 zobrazená, a zatvorí po odchode z nej
+    function skontroluj() {
+        var stav = document.getElementById('live-stav');
+        if (stav && !zdroj) {
+            zdroj = new EventSource(stav.getAttribute('data-kanal'));
+            zdroj.onmessage = function (udalost) {
+                aplikuj(JSON.parse(udalost.data));
+            };
+        } else if (!stav && zdroj) {
+            zdroj.close();
+            zdroj = null;
+        }
+    }
+
+    new MutationObserver(skontroluj).observe(document.documentElement, {childList: true, subtree: true});
+})();
@@ -0,0 +1,333 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # bez pyarrow sa tabuľky čítajú priamo z CSV
+    pa = feather = None
+
+# Spoločná dátová vrstva: každá tabuľka sa načíta raz za proces a stránky dostávajú
+# iba plytké kópie (pohľady) na zdieľané dáta. V priečinku data/ (aj v podpriečinkoch)
+# môžu byť tabuľky viacerých volieb ({ID}_SK_tab*.csv); každé voľby majú vlastnú
+# binárnu kópiu, ktorej číselné stĺpce sa čítajú priamo z pamäťovo mapovaného súboru.
+# Držia sa tabuľky len niekoľkých naposledy použitých volieb; uvoľnená tabuľka zostane
+# v pamäti, kým na ňu odkazuje niektorý modul (napr. dáta stránok pripravené pri importe).
+
+DATA_DIR = "data"
+
+# Voľby, ktoré sa použijú, ak sa pri čítaní tabuľky neuvedie iné ID
+ELECTION = os.environ.get("NRSR_ELECTION", "NRSR2023")
+
+# Počet volieb, ktorých načítané tabuľky sa naraz držia v pamäti
+MAX_LOADED_ELECTIONS = int(os.environ.get("NRSR_MAX_ELECTIONS", 4))
+
+TABLE_FILE = re.compile(r"^(?P<election>.+)_SK_(?P<code>tab\w+)\.csv$")
+
+# Binárna vyrovnávacia pamäť (Feather) vytvorená zo zdrojových CSV, pre každé voľby zvlášť
+CACHE_DIR = os.environ.get("NRSR_CACHE_DIR", "cache")
+TABLE_CACHE_DIR = os.path.join(CACHE_DIR, "tables")
+
+# Verzia formátu binárnych kópií; pri zmene sa staršie kópie prestavajú
+CACHE_FORMAT = 2
+
+# Textové stĺpce s malým počtom opakujúcich sa hodnôt ukladáme ako kategórie
+CATEGORICAL_COLUMNS = {
+    "Názov politického subjektu",
+    "Skratka politického subjektu",
+    "Názov kraja",
+    "Názov územného obvodu",
+    "Názov okresu",
+    "Názov obce",
+}
+
+# Číselné kódy a poradia, ktoré sa zmestia do 32-bitového celého čísla
+CODE_PREFIXES = ("Kód ", "Číslo ", "Poradie ", "Abecedné poradie", "Okrsok", "Vek")
+
+# Pri pandas < 3.0 zapneme Copy-on-Write, aby boli plytké kópie pre stránky len na čítanie
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+# Načítané tabuľky podľa volieb; poradie zodpovedá poslednému použitiu volieb
+_tables = OrderedDict()
+_elections = {}
+# Hash obsahu zdrojového CSV v čase načítania tabuľky do procesu (cesta -> sha256)
+_loaded_hashes = {}
+_lock = threading.Lock()
+_elections_lock = threading.Lock()
+# Zámky načítania jednotlivých tabuliek (voľby, kód), aby sa tabuľka nečítala dvakrát
+_load_locks = {}
+
+
+# Vyhľadanie volieb v priečinku s dátami: ID volieb -> priečinok s jeho tabuľkami
+def discover_elections(data_dir=None):
+    found = {}
+    for directory, _, files in os.walk(data_dir or DATA_DIR):
+        for name in files:
+            match = TABLE_FILE.match(name)
+            if match is None:
+                continue
+            election = match["election"]
+            if found.setdefault(election, directory) != directory:
+                raise ValueError(f"Tabuľky volieb {election} sú vo viacerých priečinkoch: {found[election]}, {directory}")
+    return dict(sorted(found.items()))
+
+
+# Dostupné voľby; zoznam sa zostaví raz, refresh=True ho prehľadá znova
+def elections(refresh=False):
+    with _elections_lock:
+        if refresh or not _elections:
+            _elections.clear()
+            _elections.update(discover_elections())
+        return dict(_elections)
+
+
+# ID volieb (None = predvolené voľby); vyrovnávacie pamäte analýz sa kľúčujú týmto ID
+def election_id(election=None):
+    election = election or ELECTION
+    if election not in elections():
+        raise KeyError(f"Neznáme voľby: {election}")
+    return election
+
+
+def table_path(code, election=None):
+    election = election or ELECTION
+    directory = elections().get(election, DATA_DIR)
+    return os.path.join(directory, f"{election}_SK_{code}.csv")
+
+
+# Zoznam kódov tabuliek dostupných pre voľby (napr. "tab03a")
+def available_tables(election=None):
+    election = election_id(election)
+    directory = elections()[election]
+    codes = []
+    for name in os.listdir(directory):
+        match = TABLE_FILE.match(name)
+        if match is not None and match["election"] == election:
+            codes.append(match["code"])
+    return sorted(codes)
+
+
+# Popis tabuliek volieb podľa tab_info (kód -> názov tabuľky); tabuľky bez popisu majú názov None
+def describe_tables(election=None):
+    election = election_id(election)
+    descriptions = {}
+    if os.path.exists(table_path("tab_info", election)):
+        info = pd.read_csv(table_path("tab_info", election))
+        descriptions = dict(zip(info["Názov súboru"], info["Názov tabuľky"]))
+    return {code: descriptions.get(code) for code in available_tables(election)}
+
+
+# Prevod textu s desatinnou čiarkou ("12,5") na číslo; ak stĺpec nie je číselný, vráti None
+def _parse_decimal(series):
+    values = series.dropna().astype(str).str.strip()
+    if values.empty:
+        return None
+    parsed = pd.to_numeric(values.str.replace(",", ".", regex=False), errors="coerce")
+    if parsed.isna().any():
+        return None
+    return pd.to_numeric(series.astype(str).str.replace(",", ".", regex=False), errors="coerce")
+
+
+# Zjednotenie dátových typov tabuľky
+def normalize(df):
+    df = df.copy()
+    for column in df.columns:
+        series = df[column]
+
+        if column in CATEGORICAL_COLUMNS:
+            df[column] = series.astype("category")
+            continue
+
+        if not pd.api.types.is_numeric_dtype(series):
+            parsed = _parse_decimal(series)
+            if parsed is None:
+                continue
+            series = parsed
+
+        if series.isna().any():
+            df[column] = series.astype("float64")
+        elif column.startswith(CODE_PREFIXES):
+            df[column] = series.astype("int32")
+        elif column.startswith("Počet") and (series % 1 == 0).all():
+            df[column] = series.astype("int64")
+        else:
+            df[column] = series
+    return df
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_dir(election):
+    return os.path.join(TABLE_CACHE_DIR, election)
+
+
+def _manifest_path(election):
+    return os.path.join(_cache_dir(election), "manifest.json")
+
+
+def _read_manifest(election):
+    try:
+        with open(_manifest_path(election), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# Zápis cez dočasný súbor, aby súbežné procesy nikdy nevideli rozpísaný súbor
+def _write_manifest(manifest, election):
+    path = _manifest_path(election)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+
+# Prevod do Arrow; chýbajúce hodnoty desatinných stĺpcov zostanú ako NaN (nie null),
+# aby sa stĺpce dali do pandas previesť bez kopírovania
+def _to_arrow(df):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    for column in df.columns:
+        if df[column].dtype == "float64":
+            i = table.schema.get_field_index(column)
+            table = table.set_column(i, column, pa.array(df[column].to_numpy(), from_pandas=False))
+    return table
+
+
+# Zabezpečí aktuálnu binárnu kópiu tabuľky a vráti (cesta, či_sa_prestavovala).
+# Zhoda mtime a veľkosti stačí; inak sa porovná hash obsahu zdrojového CSV.
+def _ensure_cached(code, manifest, election):
+    source = table_path(code, election)
+    stat = os.stat(source)
+    entry = manifest.get(code)
+
+    if entry and entry.get("format") == CACHE_FORMAT and os.path.exists(entry["path"]):
+        if entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return entry["path"], False
+        digest = file_hash(source)
+        if entry["sha256"] == digest:
+            entry.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+            return entry["path"], False
+    else:
+        digest = file_hash(source)
+
+    os.makedirs(_cache_dir(election), exist_ok=True)
+    path = os.path.join(_cache_dir(election), f"{code}-{digest[:16]}.feather")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    feather.write_feather(_to_arrow(normalize(pd.read_csv(source))), tmp_path, compression="uncompressed")
+    os.replace(tmp_path, path)
+
+    if entry and entry["path"] != path and os.path.exists(entry["path"]):
+        os.remove(entry["path"])
+    manifest[code] = {"path": path, "sha256": digest, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size,
+                      "format": CACHE_FORMAT}
+    return path, True
+
+
+# Prevod všetkých CSV volieb do binárnej podoby; prestavajú sa len zmenené súbory
+def build_cache(codes=None, election=None):
+    if feather is None:
+        raise RuntimeError("Pre binárnu vyrovnávaciu pamäť je potrebný balík pyarrow.")
+    election = election_id(election)
+    manifest = _read_manifest(election)
+    results = [(code, _ensure_cached(code, manifest, election)[1]) for code in (codes or available_tables(election))]
+    _write_manifest(manifest, election)
+    return results
+
+
+def _read_csv(source):
+    remember_hash(source, file_hash(source))
+    return normalize(pd.read_csv(source))
+
+
+def _read_table(code, election):
+    source = table_path(code, election)
+    if feather is None:
+        return _read_csv(source)
+
+    manifest = _read_manifest(election)
+    before = dict(manifest.get(code) or {})
+    try:
+        path, _ = _ensure_cached(code, manifest, election)
+        if manifest[code] != before:
+            _write_manifest(manifest, election)
+    except OSError:  # vyrovnávacia pamäť sa nedá zapísať (napr. priečinok len na čítanie)
+        return _read_csv(source)
+    remember_hash(source, manifest[code]["sha256"])
+    # Číselné stĺpce bez null hodnôt sú len na čítanie a ukazujú priamo do pamäťovo mapovaného
+    # súboru (stránky sa načítajú podľa potreby a systém ich môže uvoľniť); textové stĺpce
+    # a kategórie sa kopírujú. Zápis do existujúcich hodnôt tabuľky preto vyžaduje .copy().
+    return feather.read_table(path, memory_map=True).to_pandas(split_blocks=True)
+
+
+# Hash obsahu, z ktorého pochádza tabuľka načítaná v tomto procese; None, ak načítaná nie je.
+# Kľúče vyrovnávacích pamätí grafov musia zodpovedať dátam v pamäti, nie aktuálnemu súboru.
+def loaded_hash(path):
+    return _loaded_hashes.get(os.path.normpath(path))
+
+
+# Záznam hashu súboru, ktorého obsah sa práve načítal (tabuľky aj geometria)
+def remember_hash(path, digest):
+    _loaded_hashes[os.path.normpath(path)] = digest
+
+
+def _loaded(code, election):
+    with _lock:
+        loaded = _tables.setdefault(election, {})
+        _tables.move_to_end(election)
+        while len(_tables) > MAX_LOADED_ELECTIONS:
+            _tables.popitem(last=False)
+        return loaded.get(code)
+
+
+# Tabuľky volieb v pamäti; pri načítaní ďalších volieb nad limit sa uvoľnia
+# tabuľky volieb, ktoré sa najdlhšie nepoužili. Súbor sa číta mimo spoločného zámku,
+# takže pomalé načítanie jednej tabuľky nezdrží ostatné.
+def _load(code, election):
+    df = _loaded(code, election)
+    if df is not None:
+        return df
+    with _lock:
+        load_lock = _load_locks.setdefault((election, code), threading.Lock())
+    with load_lock:
+        df = _loaded(code, election)
+        if df is None:
+            df = _read_table(code, election)
+            with _lock:
+                _tables.setdefault(election, {})[code] = df
+        return df
+
+
+# Vráti tabuľku (napr. "tab03a") zvolených volieb ako pohľad na zdieľané dáta
+def get_table(code, columns=None, election=None):
+    df = _load(code, election_id(election))
+    if columns is not None:
+        df = df[list(columns)]
+    return df.copy(deep=False)
+
+
+# Voľby, ktorých tabuľky sú práve v pamäti (od najdlhšie nepoužitých)
+def loaded_elections():
+    with _lock:
+        return list(_tables)
+
+
+# Zahodenie načítaných tabuliek všetkých alebo jedných volieb (napr. po zmene zdrojových súborov)
+def clear(election=None):
+    with _lock:
+        removed = list(_tables.items()) if election is None else [(election, _tables.get(election, {}))]
+        for removed_election, tables in removed:
+            _tables.pop(removed_election, None)
+            for code in tables:
+                _loaded_hashes.pop(os.path.normpath(table_path(code, removed_election)), None)
@@ -0,0 +1,153 @@
+import functools
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+import plotly.io as pio
+import plotly.utils
+import data_store
+
+# Vyrovnávacia pamäť hotových grafov: v pamäti procesu a voliteľne aj na disku
+# (FIGURE_CACHE_PERSIST=1), aby ich nové procesy nemuseli znova počítať.
+
+FIGURE_CACHE_DIR = os.path.join(data_store.CACHE_DIR, "figures")
+PERSIST = os.environ.get("FIGURE_CACHE_PERSIST") == "1"
+
+_figures = {}
+_lock = threading.Lock()
+# Zámok pre každý kľúč, aby vytváranie jedného grafu neblokovalo ostatné dopyty
+_key_locks = {}
+
+
+_file_hashes = {}
+
+
+# Hash obsahu súboru; pre tabuľky už načítané v procese je to hash dát v pamäti
+# (tie sa pri zmene súboru nenačítajú znova), inak sa prepočíta pri zmene mtime alebo veľkosti
+def _content_hash(path):
+    loaded = data_store.loaded_hash(path)
+    if loaded is not None:
+        return loaded
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    digest = _file_hashes.get(key)
+    if digest is None:
+        digest = _file_hashes[key] = data_store.file_hash(path)
+    return digest
+
+
+# Podpis zdrojových dát podľa ich obsahu; pri zmene načítaných dát sa zmení aj kľúč grafov
+def source_signature(paths):
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(f"{path}:{_content_hash(path)}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _disk_path(key):
+    return os.path.join(FIGURE_CACHE_DIR, f"{key}.json")
+
+
+# Z disku sa grafy vracajú ako slovníky, ktoré dcc.Graph prijme bez ďalšej validácie
+def _load_from_disk(key):
+    try:
+        with open(_disk_path(key), encoding="utf-8") as f:
+            return tuple(json.loads(fig_json) for fig_json in json.load(f))
+    except (OSError, ValueError):
+        return None
+
+
+def _save_to_disk(key, figures):
+    os.makedirs(FIGURE_CACHE_DIR, exist_ok=True)
+    path = _disk_path(key)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump([pio.to_json(fig, validate=False) for fig in figures], f)
+    os.replace(tmp_path, path)
+
+
+# Vráti grafy pre daný názov; funkcia build sa zavolá len ak sa zmenili zdrojové dáta
+def get_figures(name, sources, build):
+    key = f"{name}-{source_signature(sources)}"
+    with _lock:
+        if key in _figures:
+            return _figures[key]
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+
+    with key_lock:
+        with _lock:
+            if key in _figures:
+                return _figures[key]
+
+        figures = _load_from_disk(key) if PERSIST else None
+        if figures is None:
+            figures = tuple(build())
+            # build() mohla tabuľky načítať až teraz; kľúč sa určí podľa dát, z ktorých grafy vznikli
+            key = f"{name}-{source_signature(sources)}"
+            if PERSIST:
+                _save_to_disk(key, figures)
+
+        with _lock:
+            # Staré verzie grafov s rovnakým názvom už nie sú potrebné
+            for old_key in [k for k in _figures if k.startswith(f"{name}-") and k != key]:
+                del _figures[old_key]
+                _key_locks.pop(old_key, None)
+            _figures[key] = figures
+        return figures
+
+
+def _memo_path(name, signature, args):
+    args_hash = hashlib.sha256(json.dumps(args, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(FIGURE_CACHE_DIR, f"{name}-{signature}-{args_hash}.json")
+
+
+# Memoizácia deterministických výsledkov (napr. pre callbacky) v ohraničenej LRU pamäti.
+# Kľúčom je podpis dát načítaných v procese, takže zmena súboru bez nového načítania
+# tabuliek nevytvorí nový záznam so starými dátami. Pri FIGURE_CACHE_PERSIST=1 sa
+# výsledky zdieľajú medzi procesmi cez disk.
+def memoize(name, sources, maxsize=32):
+    def decorator(func):
+        cache = OrderedDict()
+        lock = threading.Lock()
+
+        @functools.wraps(func)
+        def wrapper(*args):
+            signature = source_signature(sources)
+            key = (signature, *args)
+            with lock:
+                if key in cache:
+                    cache.move_to_end(key)
+                    return cache[key]
+
+            value = None
+            if PERSIST:
+                path = _memo_path(name, signature, args)
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        value = json.load(f)
+                except (OSError, ValueError):
+                    value = None
+            if value is None:
+                value = func(*args)
+                # Funkcia mohla zdrojové tabuľky načítať až teraz; výsledok patrí k dátam v pamäti
+                signature = source_signature(sources)
+                key = (signature, *args)
+                if PERSIST:
+                    path = _memo_path(name, signature, args)
+                    os.makedirs(FIGURE_CACHE_DIR, exist_ok=True)
+                    tmp_path = f"{path}.{os.getpid()}.tmp"
+                    with open(tmp_path, "w", encoding="utf-8") as f:
+                        json.dump(value, f, cls=plotly.utils.PlotlyJSONEncoder)
+                    os.replace(tmp_path, path)
+
+            with lock:
+                cache[key] = value
+                cache.move_to_end(key)
+                while len(cache) > maxsize:
+                    cache.popitem(last=False)
+            return value
+
+        wrapper.cache_clear = cache.clear
+        return wrapper
+    return decorator
@@ -0,0 +1,187 @@
+import functools
+import json
+import os
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+from shapely.geometry import box
+import data_store
+
+# Spoločná geometria krajov pre všetky mapové stránky: načíta sa raz,
+# zjednoduší sa na niekoľko úrovní detailu a ťažiská sa vypočítajú vopred.
+
+GEOJSON_PATH = "app/Slovakia.geojson"
+GEOMETRY_CACHE_DIR = os.path.join(data_store.CACHE_DIR, "geometry")
+MANIFEST_PATH = os.path.join(GEOMETRY_CACHE_DIR, "manifest.json")
+
+# Tolerancia zjednodušenia v stupňoch pre jednotlivé úrovne detailu
+TOLERANCES = {
+    "full": 0.0,
+    "medium": 0.002,
+    "low": 0.01,
+}
+
+# Počet desatinných miest súradníc (~1 m) v zjednodušených úrovniach
+PRECISION = 5
+
+
+def _read_source():
+    regions = gpd.read_file(GEOJSON_PATH)
+    regions = regions.rename(columns={"NM4": "Názov kraja"})
+    return regions[["Názov kraja", "geometry"]]
+
+
+# Zjednodušenie so zachovaním spoločných hraníc susedných krajov
+def simplify(regions, tolerance):
+    if tolerance == 0:
+        return regions
+    geometry = regions.geometry
+    if hasattr(geometry, "simplify_coverage"):
+        simplified = geometry.simplify_coverage(tolerance)
+    else:
+        simplified = geometry.simplify(tolerance, preserve_topology=True)
+    rounded = shapely.transform(simplified.values, lambda coords: np.round(coords, PRECISION))
+    return regions.set_geometry(gpd.GeoSeries(rounded, index=regions.index, crs=regions.crs))
+
+
+def _cached_path(level):
+    return os.path.join(GEOMETRY_CACHE_DIR, f"kraje-{level}.geojson")
+
+
+def _read_manifest():
+    try:
+        with open(MANIFEST_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# Predspracovanie: zapíše zjednodušené úrovne a ťažiská do vyrovnávacej pamäte
+def build_cache():
+    source = _read_source()
+    os.makedirs(GEOMETRY_CACHE_DIR, exist_ok=True)
+    for level, tolerance in TOLERANCES.items():
+        simplify(source, tolerance).to_file(_cached_path(level), driver="GeoJSON")
+    _centroids(source).to_csv(os.path.join(GEOMETRY_CACHE_DIR, "centroidy.csv"))
+
+    manifest = {"sha256": data_store.file_hash(GEOJSON_PATH), "levels": list(TOLERANCES)}
+    with open(MANIFEST_PATH, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    return list(TOLERANCES)
+
+
+# Predspracované súbory sa použijú len ak zodpovedajú aktuálnemu GeoJSON; geometria sa potom
+# v procese už nenačíta znova, preto sa hash zaznamená ako hash načítaných dát
+@functools.lru_cache(maxsize=1)
+def _cache_is_fresh():
+    digest = data_store.file_hash(GEOJSON_PATH)
+    data_store.remember_hash(GEOJSON_PATH, digest)
+    manifest = _read_manifest()
+    return bool(manifest) and manifest.get("sha256") == digest
+
+
+@functools.lru_cache(maxsize=None)
+def _regions(level):
+    if _cache_is_fresh() and os.path.exists(_cached_path(level)):
+        return gpd.read_file(_cached_path(level))
+    if level == "full":
+        return _read_source()
+    return simplify(_regions("full"), TOLERANCES[level])
+
+
+# Kraje v danej úrovni detailu (kópia, ktorú môže stránka ďalej upravovať)
+def regions(level="medium"):
+    return _regions(level).copy()
+
+
+def _centroids(regions):
+    points = regions.geometry.values
+    centroids = shapely.centroid(points)
+    return pd.DataFrame({
+        "Názov kraja": regions["Názov kraja"].values,
+        "lon": shapely.get_x(centroids),
+        "lat": shapely.get_y(centroids),
+    }).set_index("Názov kraja")
+
+
+# Ťažiská krajov (z plnej geometrie) pre popisky na mapách
+@functools.lru_cache(maxsize=1)
+def centroids():
+    path = os.path.join(GEOMETRY_CACHE_DIR, "centroidy.csv")
+    if _cache_is_fresh() and os.path.exists(path):
+        return pd.read_csv(path, index_col="Názov kraja")
+    return _centroids(_regions("full"))
+
+
+# GeoJSON slovník pre Plotly; kraj sa identifikuje cez properties["Názov kraja"]
+@functools.lru_cache(maxsize=None)
+def geo_interface(level="medium"):
+    return _regions(level).__geo_interface__
+
+
+# Geometrie jemnejších úrovní (voliteľné súbory): cesta a vlastnosť s kódom útvaru,
+# ktorý zodpovedá stĺpcom "Kód okresu" a "Kód obce" vo volebných tabuľkách
+LEVEL_SOURCES = {
+    "kraj": (GEOJSON_PATH, "NM4"),
+    "okres": ("app/okresy.geojson", "IDN3"),
+    "obec": ("app/obce.geojson", "IDN5"),
+}
+
+# Úroveň detailu podľa priblíženia mapy a maximálny počet útvarov v jednej odpovedi
+ZOOM_LEVELS = [(7.5, "low"), (9.5, "medium")]
+MAX_FEATURES = 800
+
+
+def level_available(level):
+    return level in LEVEL_SOURCES and os.path.exists(LEVEL_SOURCES[level][0])
+
+
+# Index geometrií jednej úrovne: riadky podľa kódu útvaru (text), stĺpce pre každú
+# úroveň detailu; priestorový index sa vytvorí nad plnou geometriou
+@functools.lru_cache(maxsize=None)
+def _level_store(level):
+    path, code_property = LEVEL_SOURCES[level]
+    source = gpd.read_file(path)
+    codes = source[code_property].astype(str).values
+    store = gpd.GeoDataFrame(
+        {"full": source.geometry.values},
+        geometry="full",
+        index=pd.Index(codes, name="kod"),
+        crs=source.crs
+    )
+    for lod, tolerance in TOLERANCES.items():
+        if tolerance:
+            store[lod] = simplify(store, tolerance).geometry.values
+    store.sindex  # priestorový index sa vytvorí hneď, nie pri prvom dopyte
+    return store
+
+
+def lod_for_zoom(zoom):
+    if zoom is None:
+        return "low"
+    for max_zoom, lod in ZOOM_LEVELS:
+        if zoom < max_zoom:
+            return lod
+    return "full"
+
+
+# Výber útvarov vo výreze mapy (lon_min, lat_min, lon_max, lat_max) v primeranom detaile;
+# vráti (kódy, GeoJSON) – identifikátorom prvku je kód útvaru. Ak je vo výreze viac ako
+# max_features útvarov, vráti None a volajúci má zobraziť hrubšiu úroveň alebo mapu priblížiť.
+def select_features(level, bounds=None, zoom=None, max_features=MAX_FEATURES):
+    store = _level_store(level)
+    if bounds is not None:
+        positions = np.sort(store.sindex.query(box(*bounds), predicate="intersects"))
+        store = store.iloc[positions]
+    if len(store) > max_features:
+        return None
+
+    lod = lod_for_zoom(zoom)
+    features = gpd.GeoSeries(store[lod].values, index=store.index, crs=store.crs)
+    return store.index.tolist(), features.__geo_interface__
+
+
+# Celkový rozsah úrovne (pre počiatočné nastavenie mapy)
+def level_bounds(level):
+    return tuple(_level_store(level).total_bounds)
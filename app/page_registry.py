@@ -0,0 +1,52 @@
+import importlib
+import os
+import threading
+
+# Zoznam stránok v poradí navigácie: (názov v URL, modul)
+PAGES = [
+    ("page-1", "pages.page_1"),
+    ("page-2", "pages.page_2"),
+    ("page-3", "pages.page_3"),
+    ("page-4", "pages.page_4"),
+    ("page-5", "pages.page_5"),
+    ("page-6", "pages.page_6"),
+    ("page-7", "pages.page_7"),
+    ("page-8", "pages.page_8"),
+    ("page-9", "pages.page_9"),
+    ("page-10", "pages.page_10"),
+    ("page-11", "pages.page_11"),
+]
+
+_modules = dict(PAGES)
+
+
+# Modul stránky sa importuje (a jeho dáta a grafy vytvoria) až pri prvom použití,
+# ďalšie volania vrátia už načítaný modul zo sys.modules
+def get_page(page_name):
+    module_name = _modules.get(page_name)
+    if module_name is None:
+        return None
+    return importlib.import_module(module_name)
+
+
+# Susedné stránky pre navigačné tlačidlá "Späť" a "Ďalej"
+def neighbours(page_name):
+    names = [name for name, _ in PAGES]
+    i = names.index(page_name)
+    prev_page = names[i - 1] if i > 0 else "home"
+    next_page = names[i + 1] if i + 1 < len(names) else None
+    return prev_page, next_page
+
+
+def _warm_up():
+    for page_name, _ in PAGES:
+        get_page(page_name)
+
+
+# Voliteľné predpripravenie všetkých stránok vo vlákne na pozadí (PAGE_WARMUP=1)
+def start_warm_up():
+    if os.environ.get("PAGE_WARMUP") != "1":
+        return None
+    thread = threading.Thread(target=_warm_up, name="page-warmup", daemon=True)
+    thread.start()
+    return thread
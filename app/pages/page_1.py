@@ -1,9 +1,11 @@
 import pandas as pd
 import plotly.graph_objects as go
 from dash import html, dcc
+import data_store
+from analytics import gender
 
 # --- Graf 1: Stredný vek kandidátov ---
-vek_df = pd.read_csv('data/NRSR2023_SK_tab0d.csv')
+vek_df = data_store.get_table('tab0d')
 stredny_vek = round(vek_df['Priemerný vek'].mean(), 1)
 
 vek_fig = go.Figure(data=[go.Bar(
@@ -20,7 +22,8 @@ vek_fig.update_layout(
 )
 
 # --- Graf 2: Podiel kandidátov s titulom ---
-tituly_df = pd.read_csv('data/NRSR2023_SK_tab0b.csv')
+candidates_df = gender.candidates()
+tituly_df = candidates_df.copy(deep=False)
 tituly_df['Titul'] = tituly_df['Titul'].apply(lambda x: 'S titulom' if pd.notna(x) else 'Bez titulu')
 title_counts = tituly_df['Titul'].value_counts()
 
@@ -36,7 +39,7 @@ tituly_fig.update_layout(
 )
 
 # --- Graf 3: Najčastejšie akademické tituly (Top 5) ---
-top_titles = pd.read_csv('data/NRSR2023_SK_tab0b.csv')['Titul'].value_counts().nlargest(5)
+top_titles = candidates_df['Titul'].value_counts().nlargest(5)
 
 top_titles_fig = go.Figure(data=[go.Bar(
     x=top_titles.index,
@@ -53,14 +56,8 @@ top_titles_fig.update_layout(
 )
 
 # --- Graf 4: Podiel mužov a žien ---
-candidates_df = pd.read_csv('data/NRSR2023_SK_tab0b.csv')
-elected_df = pd.read_csv('data/NRSR2023_SK_tab06.csv')
-
-def estimate_gender(name):
-    return 'Žena' if isinstance(name, str) and name.endswith('a') else 'Muž'
-
-candidates_df['Pohlavie'] = candidates_df['Meno'].apply(estimate_gender)
-elected_df['Pohlavie'] = elected_df['Meno'].apply(estimate_gender)
+elected_df = data_store.get_table('tab06')
+elected_df['Pohlavie'] = gender.column(elected_df)
 
 gender_counts_candidates = candidates_df['Pohlavie'].value_counts().reindex(['Muž', 'Žena'])
 gender_counts_elected = elected_df['Pohlavie'].value_counts().reindex(['Muž', 'Žena'])
@@ -0,0 +1,128 @@
+import plotly.graph_objects as go
+from dash import html, dcc
+from analytics import cube
+
+# Grafy jednotlivých osí kocky: názov, typ grafu a popis filtra
+GRAFY = {
+    "subjekt": {"nazov": "Kandidáti podľa politického subjektu", "typ": "stlpce_vodorovne", "filter": "Politický subjekt"},
+    "vek": {"nazov": "Kandidáti podľa vekovej skupiny", "typ": "stlpce", "filter": "Veková skupina"},
+    "titul": {"nazov": "Kandidáti s titulom a bez titulu", "typ": "kolac", "filter": "Titul"},
+    "pohlavie": {"nazov": "Podiel mužov a žien", "typ": "kolac", "filter": "Pohlavie"},
+    "kraj": {"nazov": "Kandidáti podľa kraja trvalého pobytu", "typ": "stlpce", "filter": "Kraj"},
+    "zvolenie": {"nazov": "Zvolení a nezvolení kandidáti", "typ": "kolac", "filter": "Zvolenie"},
+}
+
+FARBA = "#5661DB"
+FARBA_VYBER = "#DB6B79"
+FARBA_OSTATNE = "#9FB7DB"
+
+
+# Filtre z hodnôt rozbaľovacích zoznamov (poradie zodpovedá identifikátorom)
+def filtre_z_hodnot(identifikatory, hodnoty):
+    return {i["dim"]: h or [] for i, h in zip(identifikatory, hodnoty)}
+
+
+# Graf jednej osi pri filtroch ostatných osí; vybrané hodnoty tejto osi sú zvýraznené
+def vytvor_graf(dim, filtre):
+    pocty = cube.counts_by(dim, filtre)
+    vybrane = filtre.get(dim) or []
+    farby = [FARBA_VYBER if hodnota in vybrane else (FARBA_OSTATNE if vybrane else FARBA) for hodnota in pocty.index]
+    nastavenie = GRAFY[dim]
+
+    if nastavenie["typ"] == "kolac":
+        fig = go.Figure(go.Pie(labels=pocty.index, values=pocty.values, customdata=pocty.index,
+                               marker=dict(colors=farby), textinfo='percent+label', sort=False))
+    elif nastavenie["typ"] == "stlpce_vodorovne":
+        pocty = pocty.iloc[::-1]
+        fig = go.Figure(go.Bar(x=pocty.values, y=pocty.index, orientation='h', customdata=pocty.index,
+                               marker_color=farby[::-1]))
+        fig.update_layout(height=700, xaxis_title="Počet kandidátov")
+    else:
+        fig = go.Figure(go.Bar(x=pocty.index, y=pocty.values, customdata=pocty.index, marker_color=farby,
+                               text=pocty.values, textposition='outside'))
+        fig.update_layout(yaxis_title="Počet kandidátov")
+
+    fig.update_layout(
+        title=nastavenie["nazov"],
+        title_font=dict(size=20, family='Roboto', color='black', weight='bold'),
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        clickmode="event"
+    )
+    return fig
+
+
+def vytvor_suhrn(filtre):
+    pocet, vek = cube.summary(filtre)
+    if not pocet:
+        return "Výberu nezodpovedá žiadny kandidát."
+    return f"Vybraných kandidátov: {pocet}, priemerný vek: {vek:.1f} rokov"
+
+
+# Kliknutie na stĺpec alebo výsek pridá hodnotu do filtra, opakované kliknutie ju odoberie.
+# Pri výseku koláča posiela plotly.js customdata ako jednoprvkový zoznam, hodnotou je popis výseku.
+def prepni_vyber(click_data, vybrane):
+    if not click_data:
+        return vybrane
+    bod = click_data["points"][0]
+    hodnota = bod.get("customdata")
+    if isinstance(hodnota, list):
+        hodnota = hodnota[0] if len(hodnota) == 1 else None
+    if hodnota is None:
+        hodnota = bod.get("label")
+    vybrane = list(vybrane or [])
+    if hodnota in vybrane:
+        vybrane.remove(hodnota)
+    elif hodnota is not None:
+        vybrane.append(hodnota)
+    return vybrane
+
+
+def get_layout():
+    labels = cube.build()[0]
+    return html.Div([
+        html.H2("Interaktívne charakteristiky kandidátov", style={
+            'textAlign': 'center',
+            'marginBottom': '40px',
+            'marginTop': '20px',
+            'fontFamily': 'Roboto',
+            'color': 'black'
+        }),
+
+        html.P("Výber hodnoty v zozname alebo kliknutie na graf filtruje všetky ostatné grafy.",
+               style={'textAlign': 'center', 'fontFamily': 'Roboto', 'fontSize': '18px'}),
+
+        html.Div([
+            html.Div([
+                html.Label(nastavenie["filter"], style={'fontFamily': 'Roboto', 'fontWeight': 'bold'}),
+                dcc.Dropdown(
+                    id={"type": "demografia-filter", "dim": dim},
+                    options=[{"label": hodnota, "value": hodnota} for hodnota in labels[dim]],
+                    value=[],
+                    multi=True,
+                    placeholder="Všetky"
+                )
+            ], style={'width': '32%', 'display': 'inline-block', 'padding': '5px', 'verticalAlign': 'top'})
+            for dim, nastavenie in GRAFY.items()
+        ], style={'fontFamily': 'Roboto'}),
+
+        html.Div([
+            html.Button("Zrušiť filtre", id="demografia-zrusit", n_clicks=0, style={
+                'margin': '10px',
+                'padding': '10px 20px',
+                'fontWeight': 'bold',
+                'backgroundColor': '#9FB7DB',
+                'border': 'none',
+                'borderRadius': '5px',
+                'cursor': 'pointer'
+            }),
+            html.Div(id="demografia-suhrn", style={'fontFamily': 'Roboto', 'fontSize': '18px'})
+        ], style={'textAlign': 'center'}),
+
+        html.Div([
+            html.Div(dcc.Graph(id={"type": "demografia-graf", "dim": dim}),
+                     style={'width': '100%' if GRAFY[dim]["typ"] == "stlpce_vodorovne" else '48%',
+                            'display': 'inline-block', 'padding': '10px'})
+            for dim in GRAFY
+        ], style={'display': 'flex', 'flexWrap': 'wrap'}),
+    ], style={'padding': '20px'})
@@ -0,0 +1,133 @@
+import datetime
+import json
+import plotly.graph_objects as go
+import plotly.io as pio
+from dash import html, dcc, dash_table
+import push
+from analytics import live
+from pages import page_6
+
+# Kanál udalostí, cez ktorý server posiela zmeny priebežných výsledkov (pozri assets/priebezne_vysledky.js)
+KANAL = "priebezne-vysledky"
+push.add_channel(KANAL)
+
+# Vlastnosti stĺpcového grafu, ktoré sa pri zmene posielajú klientom (Plotly.restyle)
+VLASTNOSTI_STLPCOV = ["x", "y", "text", "marker.color"]
+
+
+# Text o stave spracovania okrskových zápisníc
+def vytvor_stav():
+    stav = live.progress()
+    if not live.running() and not stav["files"]:
+        return "Priebežné výsledky nie sú zapnuté (nastavte premennú prostredia LIVE_RESULTS_DIR)."
+    cas = datetime.datetime.fromtimestamp(stav["updated"]).strftime("%H:%M:%S") if stav["updated"] else "–"
+    return (f"Spracované okrskové zápisnice: {stav[live.CONFIRMED]} z {stav['Počet volebných okrskov']} "
+            f"({stav['Podiel potvrdených okrskových zápisníc v %']:.2f} %), posledná zmena: {cas}")
+
+
+def vytvor_graf_podielov(projekcia):
+    projekcia = projekcia[projekcia["Počet platných hlasov"] > 0].sort_values("Počet platných hlasov")
+    fig = go.Figure(go.Bar(
+        x=projekcia["Podiel platných hlasov v %"],
+        y=projekcia["Skratka politického subjektu"].astype(str),
+        orientation='h',
+        marker_color=[page_6.color_map.get(str(nazov), "#9FB7DB") for nazov in projekcia["Názov politického subjektu"]],
+        text=projekcia["Podiel platných hlasov v %"].map("{:.2f} %".format),
+        textposition='outside'
+    ))
+    fig.add_vline(x=5, line_dash="dash", line_color="#DB6B79")
+    fig.update_layout(
+        title="Priebežné podiely platných hlasov",
+        title_font=dict(size=20, family='Roboto', color='black', weight='bold'),
+        xaxis_title="Podiel platných hlasov (%)",
+        height=max(400, 25 * len(projekcia)),
+        plot_bgcolor="white",
+        paper_bgcolor="white"
+    )
+    return fig
+
+
+def vytvor_graf_mandatov(projekcia):
+    projekcia = projekcia[projekcia["Počet mandátov"] > 0].sort_values("Počet mandátov", ascending=False)
+    fig = go.Figure(go.Bar(
+        x=projekcia["Skratka politického subjektu"].astype(str),
+        y=projekcia["Počet mandátov"],
+        marker_color=[page_6.color_map.get(str(nazov), "#9FB7DB") for nazov in projekcia["Názov politického subjektu"]],
+        text=projekcia["Počet mandátov"],
+        textposition='outside'
+    ))
+    fig.add_hline(y=76, line_dash="dash", line_color="#DB6B79", annotation_text="väčšina (76)")
+    fig.update_layout(
+        title="Projekcia mandátov podľa spracovaných okrskov",
+        title_font=dict(size=20, family='Roboto', color='black', weight='bold'),
+        yaxis_title="Počet mandátov",
+        plot_bgcolor="white",
+        paper_bgcolor="white"
+    )
+    return fig
+
+
+# Tabuľka krajov s podielom spracovaných zápisníc a priebežnou účasťou
+def zaznamy_krajov():
+    kraje = live.summary("kraj")
+    kraje = kraje[kraje["Názov kraja"].astype(str) != "Cudzina"]
+    return kraje[["Názov kraja", "Podiel potvrdených okrskových zápisníc v %", "Účasť voličov v %"]].to_dict('records')
+
+
+# Všetky výstupy stránky pre aktuálnu verziu priebežných výsledkov
+def vytvor_vystupy():
+    projekcia = live.projection()
+    return vytvor_stav(), vytvor_graf_podielov(projekcia), vytvor_graf_mandatov(projekcia), zaznamy_krajov()
+
+
+# Údaje stĺpcov grafu pre čiastočnú aktualizáciu (Plotly.restyle) a výška grafu
+def zmena_grafu(fig):
+    graf = json.loads(pio.to_json(fig, validate=False))
+    stlpce = graf["data"][0]
+    udaje = {"x": stlpce["x"], "y": stlpce["y"], "text": stlpce["text"], "marker.color": stlpce["marker"]["color"]}
+    return {"data": {vlastnost: [udaje[vlastnost]] for vlastnost in VLASTNOSTI_STLPCOV},
+            "layout": {"height": graf["layout"].get("height")}}
+
+
+# Stav stránky pre kanál udalostí; posielajú sa len údaje grafov a tabuľky, nie celé rozloženie
+def stav_pre_klientov():
+    stav, graf_podielov, graf_mandatov, kraje = vytvor_vystupy()
+    return {
+        "verzia": live.version(),
+        "stav": stav,
+        "podiely": zmena_grafu(graf_podielov),
+        "mandaty": zmena_grafu(graf_mandatov),
+        "kraje": kraje,
+    }
+
+
+def get_layout():
+    stav, graf_podielov, graf_mandatov, kraje = vytvor_vystupy()
+    return html.Div([
+        html.H2("Priebežné výsledky volieb", style={
+            'textAlign': 'center',
+            'marginBottom': '40px',
+            'marginTop': '20px',
+            'fontFamily': 'Roboto',
+            'color': 'black'
+        }),
+
+        html.Div(stav, id="live-stav", **{"data-kanal": f"/udalosti/{KANAL}"}, style={'textAlign': 'center', 'fontFamily': 'Roboto', 'fontSize': '18px'}),
+
+        html.Div([
+            html.Div(dcc.Graph(id="live-podiely", figure=graf_podielov), style={'width': '50%', 'display': 'inline-block'}),
+            html.Div(dcc.Graph(id="live-mandaty", figure=graf_mandatov), style={'width': '50%', 'display': 'inline-block'}),
+        ], style={'display': 'flex'}),
+
+        dash_table.DataTable(
+            id="live-kraje",
+            columns=[
+                {"name": "Kraj", "id": "Názov kraja"},
+                {"name": "Spracované zápisnice (%)", "id": "Podiel potvrdených okrskových zápisníc v %"},
+                {"name": "Volebná účasť (%)", "id": "Účasť voličov v %"}
+            ],
+            data=kraje,
+            style_cell={'textAlign': 'center', 'fontFamily': 'Roboto', 'padding': '8px', 'fontSize': '14px'},
+            style_header={'backgroundColor': '#5661DB', 'color': 'white', 'fontWeight': 'bold'}
+        )
+    ], style={'padding': '20px'})
@@ -1,18 +1,20 @@
-import geopandas as gpd
-import pandas as pd
+import functools
+import math
 import plotly.graph_objects as go
 from dash import dcc, html, dash_table
+import data_store
+import geometry
+from analytics import turnout
 
-# Načítanie mapových údajov
-slovakia_map = gpd.read_file("app/Slovakia.geojson")
-slovakia_map.rename(columns={"NM4": "region"}, inplace=True)
+# Načítanie mapových údajov (zdieľaná zjednodušená geometria krajov)
+slovakia_map = geometry.regions().rename(columns={"Názov kraja": "region"})
 
 # Načítanie volebných údajov pre kraje
-df = pd.read_csv("data/NRSR2023_SK_tab02a.csv")
+df = data_store.get_table("tab02a")
 df.rename(columns={"Názov kraja": "region"}, inplace=True)
 
 # Načítanie volebných údajov pre okresy
-df_districts = pd.read_csv("data/NRSR2023_SK_tab02c.csv")
+df_districts = data_store.get_table("tab02c")
 df_districts.rename(columns={"Názov okresu": "district", "Účasť voličov v %": "turnout_percentage", "Názov kraja": "region"}, inplace=True)
 
 # Spojenie volebných údajov s mapou krajov
@@ -22,9 +24,10 @@ df_map = slovakia_map.merge(df, on="region", how="left")
 fig = go.Figure(go.Choropleth(
     z=df_map["Účasť voličov v %"],
     hoverinfo="skip",  
-    locations=df_map.index,
+    locations=df_map["region"],
     locationmode="geojson-id",
-    geojson=df_map.geometry.__geo_interface__,
+    featureidkey="properties.Názov kraja",
+    geojson=geometry.geo_interface(),
     colorscale="OrRd",
     colorbar=dict(
         title="Volebná účasť (%)",
@@ -35,11 +38,13 @@ fig = go.Figure(go.Choropleth(
     showscale=True
 ))
 
+# Popisky v predpočítaných ťažiskách krajov
+centroidy = geometry.centroids()
+
 for idx, row in df_map.iterrows():
-    if row["geometry"] is not None and not row["geometry"].is_empty:
-        centroid = row.geometry.centroid
-        lon = centroid.x
-        lat = centroid.y
+    if row["region"] in centroidy.index:
+        lon = centroidy.at[row["region"], "lon"]
+        lat = centroidy.at[row["region"], "lat"]
 
         # Manuálne posuny pre prekrývajúce sa kraje
         if row["region"] == "Bratislavský kraj":
@@ -97,19 +102,63 @@ genitive_names = {
 # Odstránenie "Cudziny" zo vstupných údajov
 df_districts = df_districts[df_districts["region"] != "Cudzina"]
 
-# Funkcia na vytvorenie jednej tabuľky
-def generate_region_table(region_name):
-    region_districts = df_districts[df_districts['region'] == region_name]
-    region_districts = region_districts.sort_values(by="turnout_percentage", ascending=False)
+# Načítanie volebných údajov pre obce (bez cudziny)
+df_municipalities = data_store.get_table("tab02d", ["Názov kraja", "Názov okresu", "Názov obce", "Počet zapísaných voličov", "Účasť voličov v %"])
+df_municipalities = df_municipalities[df_municipalities["Názov kraja"] != "Cudzina"]
+
+STLPCE_OKRESOV = [
+    {"name": "Okres", "id": "district"},
+    {"name": "Volebná účasť (%)", "id": "turnout_percentage"}
+]
+STLPCE_OBCI = [
+    {"name": "Obec", "id": "Názov obce"},
+    {"name": "Okres", "id": "Názov okresu"},
+    {"name": "Počet zapísaných voličov", "id": "Počet zapísaných voličov"},
+    {"name": "Volebná účasť (%)", "id": "Účasť voličov v %"}
+]
+
+# Záznamy tabuliek pripravené raz pri načítaní stránky (kľúč = index v identifikátore tabuľky);
+# pri zobrazení a listovaní sa už len vyberie výrez zoznamu
+zaznamy_tabuliek = {
+    region: skupina.sort_values(by="turnout_percentage", ascending=False)[["district", "turnout_percentage"]].to_dict('records')
+    for region, skupina in df_districts.groupby("region", observed=True)
+}
+zaznamy_tabuliek["obce"] = df_municipalities.sort_values(by="Účasť voličov v %", ascending=False)[[c["id"] for c in STLPCE_OBCI]].to_dict('records')
+
+POCET_RIADKOV_OKRESOV = 25
+POCET_RIADKOV_OBCI = 20
+
+# Záznamy tabuľky zoradené podľa stĺpca; každé zoradenie sa vypočíta raz
+@functools.lru_cache(maxsize=None)
+def zoradene_zaznamy(tabulka, stlpec=None, zostupne=False):
+    zaznamy = zaznamy_tabuliek[tabulka]
+    if stlpec is None:
+        return zaznamy
+    return sorted(zaznamy, key=lambda zaznam: zaznam[stlpec], reverse=zostupne)
+
+# Jedna strana tabuľky pre stránkovanie a zoraďovanie na strane servera
+def strana_tabulky(tabulka, strana, velkost, zoradenie=None):
+    if zoradenie:
+        zaznamy = zoradene_zaznamy(tabulka, zoradenie[0]["column_id"], zoradenie[0]["direction"] == "desc")
+    else:
+        zaznamy = zoradene_zaznamy(tabulka)
+    zaciatok = (strana or 0) * velkost
+    return zaznamy[zaciatok:zaciatok + velkost]
 
+# Tabuľka so stránkovaním a zoraďovaním na strane servera; prehliadač dostane len prvú stranu
+def generate_paged_table(tabulka, columns, page_size, height='400px'):
     return dash_table.DataTable(
-        id=f'district-table-{region_name}',
-        columns=[
-            {"name": "Okres", "id": "district"},
-            {"name": "Volebná účasť (%)", "id": "turnout_percentage"}
-        ],
-        data=region_districts.to_dict('records'),
-        style_table={'height': '400px', 'overflowY': 'auto', 'width': '100%'},
+        id={"type": "ucast-tabulka", "index": tabulka},
+        columns=columns,
+        data=strana_tabulky(tabulka, 0, page_size),
+        page_action="custom",
+        page_current=0,
+        page_size=page_size,
+        page_count=max(1, math.ceil(len(zaznamy_tabuliek[tabulka]) / page_size)),
+        sort_action="custom",
+        sort_mode="single",
+        sort_by=[],
+        style_table={'height': height, 'overflowY': 'auto', 'width': '100%'},
         style_cell={
             'textAlign': 'center',
             'fontFamily': 'Roboto',
@@ -127,7 +176,12 @@ def generate_region_table(region_name):
         }
     )
 
-# Funkcia na rozloženie stránok s tabuľkami 
+# Funkcia na vytvorenie jednej tabuľky
+def generate_region_table(region_name):
+    return generate_paged_table(region_name, STLPCE_OKRESOV, POCET_RIADKOV_OKRESOV)
+
+# Funkcia na rozloženie stránok s tabuľkami; rozloženie sa zostaví raz a pri ďalších návštevách sa použije znova
+@functools.lru_cache(maxsize=1)
 def generate_region_sections():
     region_sections = []
     regions = sorted([r for r in df['region'].unique() if r != "Cudzina"])  # zoradené abecedne
@@ -150,8 +204,60 @@ def generate_region_sections():
                 ], style={'width': '48%', 'padding': '10px'})
                 row.append(table)
         region_sections.append(html.Div(row, style={'display': 'flex', 'justifyContent': 'space-between'}))
-    
-    return region_sections
+
+    region_sections.append(html.Div([
+        html.H3("Volebná účasť v obciach", style={
+            'textAlign': 'center',
+            'fontFamily': 'Roboto',
+            'color': 'black',
+            'fontSize': '24px',
+            'fontWeight': 'bold'
+        }),
+        generate_paged_table("obce", STLPCE_OBCI, POCET_RIADKOV_OBCI, height='auto')
+    ], style={'padding': '10px'}))
+
+    return tuple(region_sections)
+
+# --- Rozdelenie účasti v obciach a okrskoch (pre ktorékoľvek voľby v priečinku data/) ---
+UROVNE_UCASTI = {"obec": "Obce", "okrsok": "Okrsky"}
+kody_krajov = dict(zip(df["region"].astype(str), df["Kód kraja"]))
+
+# Kraje zvolených volieb pre výber kraja (kódy krajov sa medzi voľbami môžu líšiť)
+def moznosti_krajov(volby=None):
+    kraje = turnout.table("obec", volby)[["Názov kraja", "Kód kraja"]].drop_duplicates()
+    return [{"label": str(kraj), "value": int(kod)} for kraj, kod in sorted(zip(kraje["Názov kraja"].astype(str), kraje["Kód kraja"]))]
+
+# Histogram účasti s vyznačenými percentilmi a 10 útvarov s najnižšou účasťou
+def vytvor_rozdelenie_ucasti(uroven, kod_kraja=None, volby=None):
+    where = None if kod_kraja is None else ("kraj", kod_kraja)
+    pocty, hranice = turnout.histogram(uroven, bins=50, where=where, election=volby)
+    p10, p50, p90 = turnout.percentiles(uroven, [10, 50, 90], where, volby)
+
+    fig_hist = go.Figure(go.Bar(
+        x=(hranice[:-1] + hranice[1:]) / 2,
+        y=pocty,
+        width=hranice[1] - hranice[0],
+        marker_color="#5661DB",
+        hovertemplate="%{x:.0f} %: %{y}<extra></extra>"
+    ))
+    for hodnota, popis in [(p10, "10. percentil"), (p50, "medián"), (p90, "90. percentil")]:
+        fig_hist.add_vline(x=hodnota, line_dash="dash", line_color="#DB6B79",
+                           annotation_text=f"{popis}: {hodnota:.1f} %", annotation_position="top")
+    fig_hist.update_layout(
+        title=f"{UROVNE_UCASTI[uroven]} podľa volebnej účasti",
+        title_font=dict(size=20, family='Roboto', color='black', weight='bold'),
+        xaxis_title="Volebná účasť (%)",
+        yaxis_title="Počet",
+        plot_bgcolor="white",
+        paper_bgcolor="white"
+    )
+
+    najnizsie = turnout.lowest(uroven, 10, where, volby)
+    stlpce = [{"name": "Obec", "id": "Názov obce"}, {"name": "Okres", "id": "Názov okresu"}]
+    if uroven == "okrsok":
+        stlpce.insert(1, {"name": "Okrsok", "id": "Okrsok"})
+    stlpce += [{"name": "Volebná účasť (%)", "id": turnout.TURNOUT}, {"name": "Z-skóre v okrese", "id": "Z-skóre v okrese"}]
+    return fig_hist, stlpce, najnizsie[[c["id"] for c in stlpce]].to_dict('records')
 
 def get_layout():
     return html.Div([
@@ -184,5 +290,46 @@ def get_layout():
                 'color': 'black'
         }),
 
-        *generate_region_sections()
+        *generate_region_sections(),
+
+        html.Hr(),
+
+        html.H3("Rozdelenie volebnej účasti v obciach a okrskoch", style={
+                'textAlign': 'center',
+                'fontFamily': 'Roboto',
+                'color': 'black'
+        }),
+
+        html.Div([
+            dcc.Dropdown(
+                id="ucast-volby",
+                options=[{"label": volby, "value": volby} for volby in data_store.elections()],
+                value=data_store.ELECTION,
+                clearable=False,
+                style={"width": "30%", "margin": "0 auto 10px", "fontFamily": "Roboto"}
+            ),
+            dcc.RadioItems(
+                id="ucast-uroven",
+                options=[{"label": popis, "value": uroven} for uroven, popis in UROVNE_UCASTI.items()],
+                value="okrsok",
+                inline=True,
+                inputStyle={"marginRight": "5px", "marginLeft": "15px"},
+                style={"fontFamily": "Roboto", "fontSize": "18px", "marginBottom": "10px"}
+            ),
+            dcc.Dropdown(
+                id="ucast-kraj",
+                options=moznosti_krajov(),
+                placeholder="Celé Slovensko",
+                style={"width": "60%", "margin": "0 auto", "fontFamily": "Roboto"}
+            ),
+        ], style={'textAlign': 'center'}),
+
+        dcc.Graph(id="ucast-histogram"),
+
+        html.H4("Najnižšia volebná účasť", style={'textAlign': 'center', 'fontFamily': 'Roboto'}),
+        dash_table.DataTable(
+            id="ucast-najnizsie",
+            style_cell={'textAlign': 'center', 'fontFamily': 'Roboto', 'padding': '8px', 'fontSize': '14px'},
+            style_header={'backgroundColor': '#5661DB', 'color': 'white', 'fontWeight': 'bold'}
+        )
     ], style={'padding': '20px'})
@@ -1,30 +1,105 @@
 import matplotlib
 matplotlib.use('Agg')  
 import pandas as pd
-import geopandas as gpd
 import matplotlib.pyplot as plt
 import io
-import base64
+import os
+import json
+import functools
+import dash
+import plotly.graph_objects as go
 from dash import dcc, html
 from dash.exceptions import PreventUpdate
 from dash import dash_table
+import data_store
+import figure_cache
+import geometry
 
-# Načítanie CSV s volebnými výsledkami
-csv_path = "data/NRSR2023_SK_tab03b.csv"
-data = pd.read_csv(csv_path)
+# Načítanie volebných výsledkov za kraje
+data = data_store.get_table("tab03b")
 
-# Načítanie GeoJSON súboru s hranicami krajov Slovenska
-geojson_path = "app/Slovakia.geojson"
-geo_data = gpd.read_file(geojson_path)
+# Hranice krajov Slovenska (zdieľaná zjednodušená geometria)
+geo_data = geometry.regions()
 
-# Premenovanie stĺpcov pre správne zlúčenie
-geo_data = geo_data.rename(columns={"NM4": "Názov kraja"})
-data["Podiel platných hlasov v %"] = data["Podiel platných hlasov v %"].astype(str).str.replace(",", ".").astype(float)
+# Zdrojové súbory, pri ktorých zmene sa uložené mapy a tabuľky zneplatnia
+SOURCES = [data_store.table_path("tab03b"), data_store.table_path("tab03d"), geometry.GEOJSON_PATH]
 
 # Získanie zoznamu politických subjektov 
 subjekty = data["Názov politického subjektu"].unique()
 
-def zobraz_mapu(subjekt):
+# Podpora subjektov v krajoch: riadky v poradí útvarov mapy, stĺpce podľa subjektov
+podpora_krajov = data.pivot_table(
+    index="Názov kraja",
+    columns="Názov politického subjektu",
+    values="Podiel platných hlasov v %",
+    observed=True
+).reindex(geo_data["Názov kraja"])
+
+# Body pre popisky s percentami (predpočítané ťažiská krajov v poradí mapy)
+centroidy = geometry.centroids().reindex(geo_data["Názov kraja"])
+
+
+# Malý vektor hodnôt pre jeden subjekt (jedna hodnota na kraj)
+def hodnoty_mapy(subjekt):
+    return [None if pd.isna(v) else round(float(v), 2) for v in podpora_krajov[subjekt]]
+
+
+def popisky_mapy(hodnoty):
+    return [f"{v:.1f}%" if v is not None else "" for v in hodnoty]
+
+
+def nazov_mapy(subjekt):
+    return f"Podpora politického subjektu: {subjekt}"
+
+
+# Vektorová mapa vykresľovaná v prehliadači; geometria sa posiela len raz s rozložením stránky
+def vytvor_mapu(subjekt):
+    hodnoty = hodnoty_mapy(subjekt)
+    fig = go.Figure(go.Choropleth(
+        geojson=geometry.geo_interface(),
+        featureidkey="properties.Názov kraja",
+        locations=geo_data["Názov kraja"].tolist(),
+        z=hodnoty,
+        colorscale="RdBu_r",
+        marker_line_color="black",
+        colorbar=dict(title="Podpora subjektu v %", orientation="h"),
+        hovertemplate="%{location}<br>%{z:.2f}%<extra></extra>"
+    ))
+    fig.add_trace(go.Scattergeo(
+        lon=centroidy["lon"].tolist(),
+        lat=centroidy["lat"].tolist(),
+        text=popisky_mapy(hodnoty),
+        mode="text",
+        textfont=dict(size=11, color="black", family="Roboto"),
+        hoverinfo="skip",
+        showlegend=False
+    ))
+    fig.update_geos(fitbounds="locations", visible=False, projection_type="mercator")
+    fig.update_layout(
+        title=nazov_mapy(subjekt),
+        title_font=dict(size=18, family='Roboto', color='black'),
+        margin={"r": 0, "t": 50, "l": 0, "b": 0},
+        dragmode=False
+    )
+    return fig
+
+
+# Čiastočná aktualizácia mapy: prenášajú sa iba hodnoty, popisky a titulok
+def aktualizuj_mapu(subjekt):
+    hodnoty = hodnoty_mapy(subjekt)
+    patch = dash.Patch()
+    patch["data"][0]["z"] = hodnoty
+    patch["data"][1]["text"] = popisky_mapy(hodnoty)
+    patch["layout"]["title"]["text"] = nazov_mapy(subjekt)
+    return patch
+
+
+# Predvykreslené mapy a tabuľky (vytvára ich skript prerender_maps.py)
+PRERENDER_DIR = "app/assets/maps"
+PRERENDER_MANIFEST = os.path.join(PRERENDER_DIR, "manifest.json")
+
+# Vykreslenie mapy podpory subjektu do PNG
+def vykresli_mapu(subjekt):
     df_filtered = data[data["Názov politického subjektu"] == subjekt]
     geo_merged = geo_data.merge(df_filtered, on="Názov kraja", how="left")
 
@@ -42,7 +117,7 @@ def zobraz_mapu(subjekt):
         if not pd.isna(row["Podiel platných hlasov v %"]):
             ax.annotate(
                 f"{row['Podiel platných hlasov v %']:.1f}%",
-                xy=(row["geometry"].centroid.x, row["geometry"].centroid.y),
+                xy=(centroidy.at[row["Názov kraja"], "lon"], centroidy.at[row["Názov kraja"], "lat"]),
                 xytext=(5, 5),
                 textcoords="offset points",
                 ha='center',
@@ -55,16 +130,43 @@ def zobraz_mapu(subjekt):
 
     buffer = io.BytesIO()
     plt.savefig(buffer, format="png", bbox_inches="tight")
-    buffer.seek(0)
-    encoded_image = base64.b64encode(buffer.read()).decode("utf-8")
     plt.close(fig)
 
-    return f"data:image/png;base64,{encoded_image}"
+    return buffer.getvalue()
+
+
+# Manifest predvykreslených súborov; použije sa len ak zodpovedá aktuálnym dátam.
+# Kľúčom je aj čas zmeny manifestu, aby sa súbory predvykreslené po štarte aplikácie použili.
+@functools.lru_cache(maxsize=1)
+def _predvykreslene(signature, manifest_mtime):
+    try:
+        with open(PRERENDER_MANIFEST, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("signature") != signature:
+        return {}
+    return manifest["subjects"]
 
 
-# Načítanie dát
-csv_path = "data/NRSR2023_SK_tab03d.csv"
-data2 = pd.read_csv(csv_path)
+def predvykreslene(subjekt):
+    try:
+        manifest_mtime = os.stat(PRERENDER_MANIFEST).st_mtime_ns
+    except OSError:
+        manifest_mtime = None
+    return _predvykreslene(figure_cache.source_signature(SOURCES), manifest_mtime).get(subjekt)
+
+
+# Odkaz na stiahnutie mapy v PNG ponúkame len pre predvykreslené súbory
+def mapa_na_stiahnutie(subjekt):
+    predvykreslena = predvykreslene(subjekt)
+    if predvykreslena:
+        return dash.get_asset_url(predvykreslena["map"]), {"display": "block", "textAlign": "center", "fontFamily": "Roboto"}
+    return None, {"display": "none"}
+
+
+# Načítanie dát za okresy
+data2 = data_store.get_table("tab03d")
 
 # Získanie zoznamu subjektov
 subjekty2 = data2["Názov politického subjektu"].unique()
@@ -82,27 +184,44 @@ genitive_names = {
     "Košický kraj": "Košického kraja"
 }
 
+# Index subjekt → kraje → okresy zostavený pri štarte jedným zoradením tabuľky:
+# kraje abecedne, okresy podľa podielu hlasov zostupne (pri zhode podľa názvu)
+def _zostav_index_tabuliek():
+    stlpce = ["Názov politického subjektu", "Názov kraja", "Názov okresu", "Podiel platných hlasov v %"]
+    df = data2[stlpce].astype({"Názov politického subjektu": str, "Názov kraja": str, "Názov okresu": str})
+    df = df.sort_values(
+        by=["Názov politického subjektu", "Názov kraja", "Podiel platných hlasov v %", "Názov okresu"],
+        ascending=[True, True, False, True]
+    )
+
+    index = {}
+    for (subjekt, kraj), skupina in df.groupby(["Názov politického subjektu", "Názov kraja"], sort=False):
+        okresy = skupina[["Názov okresu", "Podiel platných hlasov v %"]].to_dict("records")
+        index.setdefault(subjekt, []).append({"kraj": kraj, "okresy": okresy})
+    return index
+
+
+index_tabuliek = _zostav_index_tabuliek()
+
+
+# Údaje tabuliek: zoznam krajov s okresmi zoradenými podľa podpory subjektu
+def tabulky_data(subjekt):
+    return index_tabuliek.get(subjekt, [])
+
+
 # Funkcia na vytvorenie tabuliek s podporou pre každý kraj
+@figure_cache.memoize("page_3_tabulky", SOURCES)
 def vytvor_tabulky(subjekt):
-    df_filtered = data2[data2["Názov politického subjektu"] == subjekt]
+    predvykreslena = predvykreslene(subjekt)
+    kraje = predvykreslena["tables"] if predvykreslena else tabulky_data(subjekt)
     tabulky = []
 
-    for kraj in sorted(df_filtered["Názov kraja"].unique()):
-        df_kraj = df_filtered[df_filtered["Názov kraja"] == kraj]
-
-        okresy_data = []
-        for okres in sorted(df_kraj["Názov okresu"].unique()):
-            df_okres = df_kraj[df_kraj["Názov okresu"] == okres]
-            
-            for _, row in df_okres.iterrows():
-                okresy_data.append({
-                    "Názov okresu": row["Názov okresu"],
-                    "Podiel platných hlasov v %": row["Podiel platných hlasov v %"]
-                })
+    for polozka in kraje:
+        kraj = polozka["kraj"]
+        okresy_data = polozka["okresy"]
 
         # Získanie správneho názvu krajov v genitíve
-        kraj_genitive = genitive_names.get(kraj, kraj)  
-        okresy_data.sort(key=lambda x: x["Podiel platných hlasov v %"], reverse=True)
+        kraj_genitive = genitive_names.get(kraj, kraj)
 
         # Vytvorenie tabuľky pre každý kraj
         tabulka = dash_table.DataTable(
@@ -187,13 +306,12 @@ def get_layout():
             }
         ),
 
-        html.Img(id="mapa-obrazok", style={
-            "width": "50%",
-            "height": "auto",
-            "marginTop": "30px",
-            "display": "block",
-            "marginLeft": "auto",
-            "marginRight": "auto"
-        }),
+        dcc.Graph(
+            id="mapa-graf",
+            figure=vytvor_mapu(subjekty[0]),
+            config={"displayModeBar": False},
+            style={"width": "60%", "height": "500px", "marginTop": "30px", "marginLeft": "auto", "marginRight": "auto"}
+        ),
+        html.A("Stiahnuť mapu (PNG)", id="mapa-png", download="", target="_blank", style={"display": "none"}),
         html.Div(id="tabulky-kraje", style={"marginTop": "30px"})
     ], style={'padding': '20px'})
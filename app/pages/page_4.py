@@ -3,12 +3,18 @@ import plotly.express as px
 import plotly.graph_objects as go
 from dash import html
 from dash import dcc
+import data_store
+from analytics import ranking
+
+# Každá tabuľka sa načíta iba raz
+df_tab07a = data_store.get_table('tab07a')
+df_tab07b = data_store.get_table('tab07b')
 
 # Načítanie údajov pre celé Slovensko
-df_sr = pd.read_csv('data/NRSR2023_SK_tab07a.csv', usecols=['Názov politického subjektu', 'Počet platných prednostných hlasov']).copy()
+df_sr = df_tab07a[['Názov politického subjektu', 'Počet platných prednostných hlasov']]
 
 # Agregácia počtu hlasov podľa politického subjektu
-df_aggregated = df_sr.groupby('Názov politického subjektu', as_index=False).agg({'Počet platných prednostných hlasov': 'sum'})
+df_aggregated = df_sr.groupby('Názov politického subjektu', as_index=False, observed=True).agg({'Počet platných prednostných hlasov': 'sum'})
 
 # Získanie top 10 politických subjektov
 top_10_subjekty = df_aggregated.sort_values(by='Počet platných prednostných hlasov', ascending=False).head(10)
@@ -32,19 +38,19 @@ fig_pie.update_layout(
 )
 
 # Načítanie údajov pre kraje
-df_kraje = pd.read_csv('data/NRSR2023_SK_tab07b.csv', usecols=['Názov kraja', 'Názov politického subjektu', 'Počet platných prednostných hlasov']).copy()
+df_kraje = df_tab07b[['Názov kraja', 'Názov politického subjektu', 'Počet platných prednostných hlasov']]
 
 # Agregácia hlasov podľa kraja a politického subjektu
-df_kraje_aggregated = df_kraje.groupby(['Názov kraja', 'Názov politického subjektu'], as_index=False).agg({'Počet platných prednostných hlasov': 'sum'})
+df_kraje_aggregated = df_kraje.groupby(['Názov kraja', 'Názov politického subjektu'], as_index=False, observed=True).agg({'Počet platných prednostných hlasov': 'sum'})
 
-df_sr_aggregated = df_kraje.groupby('Názov politického subjektu', as_index=False).agg({'Počet platných prednostných hlasov': 'sum'})
+df_sr_aggregated = df_kraje.groupby('Názov politického subjektu', as_index=False, observed=True).agg({'Počet platných prednostných hlasov': 'sum'})
 
 top_10_subjekty = df_sr_aggregated.sort_values(by='Počet platných prednostných hlasov', ascending=False).head(10)
 
 df_kraje_top_10 = df_kraje_aggregated[df_kraje_aggregated['Názov politického subjektu'].isin(top_10_subjekty['Názov politického subjektu'])].copy()
 
 # Agregácia hlasov podľa krajov
-df_kraje_aggregated_by_total = df_kraje_top_10.groupby('Názov kraja', as_index=False).agg({'Počet platných prednostných hlasov': 'sum'})
+df_kraje_aggregated_by_total = df_kraje_top_10.groupby('Názov kraja', as_index=False, observed=True).agg({'Počet platných prednostných hlasov': 'sum'})
 df_kraje_aggregated_by_total = df_kraje_aggregated_by_total.sort_values(by='Počet platných prednostných hlasov', ascending=False)
 
 # Udržanie správneho poradia politických subjektov
@@ -52,13 +58,13 @@ top_10_subjekty = top_10_subjekty.sort_values(by='Počet platných prednostných
 
 df_kraje_top_10['Názov kraja'] = pd.Categorical(
     df_kraje_top_10['Názov kraja'],
-    categories=df_kraje_aggregated_by_total['Názov kraja'],
+    categories=df_kraje_aggregated_by_total['Názov kraja'].tolist(),
     ordered=True
 )
 
 df_kraje_top_10['Názov politického subjektu'] = pd.Categorical(
     df_kraje_top_10['Názov politického subjektu'],
-    categories=top_10_subjekty['Názov politického subjektu'],
+    categories=top_10_subjekty['Názov politického subjektu'].tolist(),
     ordered=True
 )
 
@@ -79,15 +85,8 @@ fig_bar.update_layout(
     paper_bgcolor="white"
 )
 
-# Načítanie údajov pre celé Slovensko
-df_sr = pd.read_csv('data/NRSR2023_SK_tab07a.csv', usecols=['Meno', 'Priezvisko', 'Názov politického subjektu', 'Počet platných prednostných hlasov']).copy()
-
-# Agregácia počtu hlasov podľa kandidáta
-df_sr['Celé meno'] = df_sr['Meno'] + ' ' + df_sr['Priezvisko']
-df_candidates = df_sr.groupby(['Celé meno', 'Názov politického subjektu'], as_index=False).agg({'Počet platných prednostných hlasov': 'sum'})
-
-# Získanie top 10 kandidátov
-top_10_kandidati = df_candidates.sort_values(by='Počet platných prednostných hlasov', ascending=False).head(10)
+# Top 10 kandidátov za celé Slovensko z indexu poradia
+top_10_kandidati = ranking.top('sr', k=10)
 
 # Tabuľka top 10 kandidátov
 table_fig = go.Figure(data=[go.Table(
@@ -125,27 +124,14 @@ kraj_names = {
 valid_kraje = ["Bratislavský kraj", "Trnavský kraj", "Trenčiansky kraj", "Nitriansky kraj", 
                "Žilinský kraj", "Banskobystrický kraj", "Prešovský kraj", "Košický kraj"]
 
-# Načítanie kandidátov podľa krajov
-df_kandidati_kraje = pd.read_csv('data/NRSR2023_SK_tab07b.csv', usecols=['Meno', 'Priezvisko', 'Názov politického subjektu', 'Počet platných prednostných hlasov', 'Názov kraja']).copy()
-
-# Vytvorenie celého mena
-df_kandidati_kraje['Celé meno'] = df_kandidati_kraje['Meno'] + ' ' + df_kandidati_kraje['Priezvisko']
-
-# Filtrácia na platné kraje
-df_kandidati_kraje = df_kandidati_kraje[df_kandidati_kraje['Názov kraja'].isin(valid_kraje)]
-
-# Agregácia hlasov podľa kandidáta a kraja
-df_kandidati_kraje_grouped = df_kandidati_kraje.groupby(['Názov kraja', 'Celé meno', 'Názov politického subjektu'], as_index=False).agg({
-    'Počet platných prednostných hlasov': 'sum'
-})
+# Kódy krajov pre výber z indexu poradia
+kody_krajov = dict(zip(df_tab07b['Názov kraja'].astype(str), df_tab07b['Kód kraja']))
 
 # Vytvorenie tabuliek pre každý kraj
 krajinske_tabulky = []
 
 for kraj in sorted(valid_kraje):
-    df_kraj = df_kandidati_kraje_grouped[df_kandidati_kraje_grouped['Názov kraja'] == kraj].sort_values(by='Počet platných prednostných hlasov', ascending=False)
-
-    df_kraj_top5 = df_kraj.head(5)
+    df_kraj_top5 = ranking.top('kraj', kody_krajov[kraj], k=5)
 
     table = go.Figure(data=[go.Table(
         header=dict(values=['Celé meno', 'Názov politického subjektu', 'Počet platných prednostných hlasov'],
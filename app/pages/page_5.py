@@ -1,14 +1,18 @@
-import pandas as pd
-import geopandas as gpd
 import matplotlib.colors as mcolors
 import plotly.express as px
 import plotly.graph_objects as go
 from dash import html, dcc
+import data_store
+import figure_cache
+import geometry
 
-def get_layout():
+# Zdrojové súbory, pri ktorých zmene sa grafy prepočítajú
+SOURCES = [data_store.table_path("tab03a"), data_store.table_path("tab03b"), geometry.GEOJSON_PATH]
+
+# Výpočet oboch grafov stránky (volá sa iba pri zmene zdrojových dát)
+def build_figures():
     # --------------------- PRVÝ GRAF: Kombinovaný barplot a scatterplot ---------------------
-    data = pd.read_csv("data/NRSR2023_SK_tab03a.csv")
-    df = pd.DataFrame(data)
+    df = data_store.get_table("tab03a")
 
     df = df.sort_values(by="Počet platných hlasov", ascending=False)
 
@@ -43,30 +47,29 @@ def get_layout():
     )
 
     # --------------------- DRUHÝ GRAF: Víťazné strany podľa krajov ---------------------
-    slovakia_map = gpd.read_file("app/Slovakia.geojson")
-    slovakia_map = slovakia_map.rename(columns={"NM4": "region"})
+    slovakia_map = geometry.regions().rename(columns={"Názov kraja": "region"})
 
-    df2 = pd.read_csv("data/NRSR2023_SK_tab03b.csv")
+    df2 = data_store.get_table("tab03b")
     df2 = df2.rename(columns={"Názov kraja": "region"})
 
     # Získanie víťazov v krajoch
-    df_max_votes = df2.loc[df2.groupby("region")["Počet platných hlasov"].idxmax()]
+    df_max_votes = df2.loc[df2.groupby("region", observed=True)["Počet platných hlasov"].idxmax()]
     df_map = slovakia_map.merge(df_max_votes, on="region", how="left")
     df_map['Názov kraja'] = df_map['region']
 
     # Farby podľa strán
     unique_parties = df_map['Názov politického subjektu'].dropna().unique()
     party_colors = dict(zip(unique_parties, mcolors.TABLEAU_COLORS.values()))
-    df_map['color'] = df_map['Názov politického subjektu'].map(party_colors)
+    df_map['color'] = df_map['Názov politického subjektu'].astype(object).map(party_colors)
     df_map['color'] = df_map['color'].fillna("gray")
 
-    geojson_data = df_map.__geo_interface__
+    geojson_data = geometry.geo_interface()
 
     fig2 = px.choropleth_mapbox(
     df_map,
     geojson=geojson_data,
     locations='region',
-    featureidkey='properties.region',
+    featureidkey='properties.Názov kraja',
     color='Názov politického subjektu',
     color_discrete_map=party_colors,
     mapbox_style="white-bg",  
@@ -94,6 +97,11 @@ def get_layout():
         plot_bgcolor="white"
     )
 
+    return fig1, fig2
+
+def get_layout():
+    fig1, fig2 = figure_cache.get_figures("page_5", SOURCES, build_figures)
+
     return html.Div([
         html.H2("Preferencie politických subjektov a víťazi podľa krajov", style={
             'textAlign': 'center',
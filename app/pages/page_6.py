@@ -1,9 +1,9 @@
-import pandas as pd
 import plotly.express as px
 from dash import html, dcc
+import data_store
 
 # Načítanie dát
-df = pd.read_csv('data/NRSR2023_SK_tab04.csv')
+df = data_store.get_table('tab04')
 
 # Výber potrebných stľpcov
 df = df[['Názov politického subjektu', 'Počet platných hlasov', 'Pridelené mandáty spolu', 'Počet kandidátov']]
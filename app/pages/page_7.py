@@ -0,0 +1,132 @@
+import functools
+import plotly.graph_objects as go
+from dash import dcc, html
+import data_store
+import geometry
+
+# Úrovne mapy: tabuľka s horizontálnym pohľadom a stĺpce s kódom a názvom útvaru
+UROVNE = {
+    "kraj": {"tabulka": "tab08a", "kod": "Názov kraja", "nazov": "Názov kraja", "popis": "Kraje"},
+    "okres": {"tabulka": "tab08c", "kod": "Kód okresu", "nazov": "Názov okresu", "popis": "Okresy"},
+    "obec": {"tabulka": "tab08d", "kod": "Kód obce", "nazov": "Názov obce", "popis": "Obce"},
+}
+
+# Hrubšia úroveň, ktorá sa zobrazí, kým je vo výreze priveľa útvarov zvolenej úrovne
+HRUBSIA_UROVEN = {"obec": "okres", "okres": "kraj"}
+
+# Zoznam subjektov so skratkami, ktoré sa používajú v názvoch stĺpcov tab08*
+subjekty = data_store.get_table("tab0a")
+
+
+# Podiely hlasov jednej úrovne: riadky podľa kódu útvaru, stĺpce podľa čísla subjektu
+@functools.lru_cache(maxsize=None)
+def podiely(uroven):
+    nastavenie = UROVNE[uroven]
+    df = data_store.get_table(nastavenie["tabulka"])
+    df = df[df["Názov kraja"] != "Cudzina"]
+
+    stlpce = {
+        f"Podiel platných hlasov v % za {skratka}": int(cislo)
+        for cislo, skratka in zip(subjekty["Číslo politického subjektu"], subjekty["Skratka politického subjektu"])
+    }
+    # Prázdny podiel v tab08 znamená, že subjekt v útvare nedostal žiadny hlas
+    tabulka = df[list(stlpce)].rename(columns=stlpce).fillna(0)
+    tabulka.index = df[nastavenie["kod"]].astype(str).values
+    tabulka["nazov"] = df[nastavenie["nazov"]].astype(str).values
+    return tabulka
+
+
+# Výrez mapy z relayoutData (rohy viditeľnej oblasti a priblíženie)
+def vyrez_mapy(relayout):
+    if not relayout:
+        return None, None
+    rohy = (relayout.get("mapbox._derived") or {}).get("coordinates")
+    if not rohy:
+        return None, relayout.get("mapbox.zoom")
+    lons = [bod[0] for bod in rohy]
+    lats = [bod[1] for bod in rohy]
+    return (min(lons), min(lats), max(lons), max(lats)), relayout.get("mapbox.zoom")
+
+
+# Mapa podpory subjektu; posielajú sa len útvary vo výreze v detaile podľa priblíženia
+def vytvor_mapu(uroven, cislo, bounds=None, zoom=None):
+    fig = go.Figure()
+    fig.update_layout(
+        mapbox=dict(style="white-bg", center={"lat": 48.7, "lon": 19.7}, zoom=6.2),
+        uirevision="detail-mapa",
+        margin={"r": 0, "t": 60, "l": 0, "b": 0},
+        height=650,
+        title_font=dict(size=20, family='Roboto', color='black', weight='bold'),
+        paper_bgcolor="white"
+    )
+
+    if not geometry.level_available(uroven):
+        fig.update_layout(title=f"Geometria pre úroveň „{UROVNE[uroven]['popis']}“ nie je k dispozícii")
+        return fig
+
+    zobrazena = uroven
+    vyber_utvarov = geometry.select_features(zobrazena, bounds, zoom)
+    while vyber_utvarov is None and geometry.level_available(HRUBSIA_UROVEN.get(zobrazena)):
+        zobrazena = HRUBSIA_UROVEN[zobrazena]
+        vyber_utvarov = geometry.select_features(zobrazena, bounds, zoom)
+    if vyber_utvarov is None:
+        fig.update_layout(title=f"{UROVNE[uroven]['popis']} sa zobrazia po priblížení mapy")
+        return fig
+
+    kody, geojson = vyber_utvarov
+    tabulka = podiely(zobrazena)
+    vyber = tabulka.reindex(kody)
+    nazov_subjektu = subjekty.loc[subjekty["Číslo politického subjektu"] == cislo, "Názov politického subjektu"].iloc[0]
+
+    fig.add_trace(go.Choroplethmapbox(
+        geojson=geojson,
+        locations=kody,
+        z=vyber[cislo],
+        zmin=tabulka[cislo].min(),
+        zmax=tabulka[cislo].max(),
+        text=vyber["nazov"],
+        colorscale="RdBu_r",
+        marker_line_width=0.3,
+        marker_line_color="black",
+        colorbar=dict(title="Podiel hlasov (%)"),
+        hovertemplate="%{text}<br>%{z:.2f}%<extra></extra>"
+    ))
+    nazov = f"{UROVNE[zobrazena]['popis']}: podpora subjektu {nazov_subjektu}"
+    if zobrazena != uroven:
+        nazov += f" ({UROVNE[uroven]['popis'].lower()} sa zobrazia po priblížení mapy)"
+    fig.update_layout(title=nazov)
+    return fig
+
+
+def get_layout():
+    return html.Div([
+        html.H2("Mapa podpory politických subjektov podľa okresov a obcí", style={
+            'textAlign': 'center',
+            'marginBottom': '40px',
+            'marginTop': '20px',
+            'fontFamily': 'Roboto',
+            'color': 'black'
+        }),
+
+        dcc.RadioItems(
+            id="detail-uroven",
+            options=[{"label": nastavenie["popis"], "value": uroven} for uroven, nastavenie in UROVNE.items()],
+            value="okres",
+            inline=True,
+            inputStyle={"marginRight": "5px", "marginLeft": "15px"},
+            style={"textAlign": "center", "fontFamily": "Roboto", "fontSize": "18px", "marginBottom": "10px"}
+        ),
+
+        dcc.Dropdown(
+            id="detail-subjekt",
+            options=[
+                {"label": nazov, "value": int(cislo)}
+                for cislo, nazov in zip(subjekty["Číslo politického subjektu"], subjekty["Názov politického subjektu"])
+            ],
+            value=int(subjekty["Číslo politického subjektu"].iloc[0]),
+            clearable=False,
+            style={"width": "60%", "margin": "0 auto", "fontFamily": "Roboto"}
+        ),
+
+        dcc.Graph(id="detail-mapa", style={"marginTop": "30px"})
+    ], style={'padding': '20px'})
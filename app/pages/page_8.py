@@ -0,0 +1,150 @@
+import numpy as np
+import plotly.graph_objects as go
+from dash import html, dcc
+from analytics import seats, simulation
+from pages import page_6
+
+# Hlasy subjektov za SR a ich skutočné podiely
+df = seats.national_votes()
+celkom_hlasov = int(df['Počet platných hlasov'].sum())
+df['Podiel'] = (100 * df['Počet platných hlasov'] / celkom_hlasov).round(2)
+
+# Posuvníky sa zobrazia pre subjekty s aspoň 1 % hlasov, ostatné si ponechajú skutočný podiel
+hlavne_subjekty = df[df['Podiel'] >= 1].sort_values('Podiel', ascending=False)
+
+# Skutočné mandáty (tab04) pre porovnanie so scenárom
+skutocne_mandaty = dict(zip(page_6.df['Názov politického subjektu'], page_6.df['Pridelené mandáty spolu']))
+
+background_color = "#FFFFFF"
+title_style = dict(size=24, family='Roboto', color='black', weight='bold')
+
+
+def farba(subjekt):
+    return page_6.color_map.get(subjekt, "#B0B0B0")
+
+
+# Podiely všetkých subjektov (v poradí tab03a) po úprave hlavných subjektov
+def podiely_scenara(zadane):
+    podiely = df['Podiel'].to_numpy().copy()
+    for cislo, podiel in zadane.items():
+        podiely[(df['Číslo politického subjektu'] == cislo).to_numpy()] = podiel or 0
+    return tuple(np.round(podiely, 2).tolist())
+
+
+def _upravit_graf(fig, nazov, y_nazov):
+    fig.update_layout(title=nazov,
+                      yaxis_title=y_nazov,
+                      plot_bgcolor=background_color,
+                      paper_bgcolor=background_color,
+                      title_font=title_style,
+                      barmode='group',
+                      legend=dict(orientation='h', y=-0.35))
+
+
+# Mandáty podľa scenára v porovnaní so skutočným výsledkom
+def vytvor_graf_mandatov(podiely, kvorum):
+    hlasy = simulation.votes_from_shares(podiely, celkom_hlasov)
+    vysledok = seats.allocate(hlasy, threshold=kvorum)
+
+    nazvy = df['Názov politického subjektu'].astype(str).to_numpy()
+    zobrazit = (vysledok.seats > 0) | np.isin(nazvy, list(skutocne_mandaty))
+    poradie = np.argsort(-hlasy[zobrazit], kind='stable')
+    nazvy = nazvy[zobrazit][poradie]
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=nazvy,
+                         y=[skutocne_mandaty.get(n, 0) for n in nazvy],
+                         name='Skutočný výsledok',
+                         marker=dict(color='#D3D3D3', line=dict(width=1, color='black'))))
+    fig.add_trace(go.Bar(x=nazvy,
+                         y=vysledok.seats[zobrazit][poradie],
+                         name='Scenár',
+                         marker=dict(color=[farba(n) for n in nazvy], line=dict(width=1, color='black'))))
+    _upravit_graf(fig, 'Počet mandátov podľa scenára', 'Počet mandátov')
+
+    suhrn = (f"Súčet zadaných podielov je {sum(podiely):.2f} % (podiely sa prepočítajú na 100 %). "
+             f"Republikové volebné číslo: {int(vysledok.rvc)}, do parlamentu postupuje "
+             f"{int(vysledok.advancing.sum())} subjektov.")
+    return fig, suhrn
+
+
+# Rozdelenie počtu mandátov zo simulácie: priemer a 90 % interval
+def vytvor_graf_simulacie(podiely, kvorum, neistota):
+    fig = go.Figure()
+    if neistota not in simulation.UNCERTAINTY:
+        _upravit_graf(fig, 'Simulácia neistoty je vypnutá', 'Počet mandátov')
+        return fig
+
+    histogram, postup = simulation.simulate(podiely, celkom_hlasov, float(kvorum), neistota)
+    priemer, kvantily = simulation.summarize(histogram)
+
+    nazvy = df['Názov politického subjektu'].astype(str).to_numpy()
+    zobrazit = priemer >= 0.05
+    poradie = np.argsort(-priemer[zobrazit], kind='stable')
+    vyber = np.flatnonzero(zobrazit)[poradie]
+
+    fig.add_trace(go.Bar(
+        x=nazvy[vyber],
+        y=priemer[vyber],
+        error_y=dict(type='data',
+                     symmetric=False,
+                     array=kvantily[0.95][vyber] - priemer[vyber],
+                     arrayminus=priemer[vyber] - kvantily[0.05][vyber]),
+        customdata=np.column_stack([kvantily[0.05][vyber], kvantily[0.95][vyber], 100 * postup[vyber]]),
+        hovertemplate='%{x}<br>Priemer: %{y:.1f}<br>90 % interval: %{customdata[0]}–%{customdata[1]}'
+                      '<br>Pravdepodobnosť vstupu do parlamentu: %{customdata[2]:.1f} %<extra></extra>',
+        marker=dict(color=[farba(n) for n in nazvy[vyber]], line=dict(width=1, color='black')),
+        name='Simulácia'
+    ))
+    _upravit_graf(fig, f'Simulácia ({simulation.DRAWS} opakovaní, neistota: {neistota})', 'Počet mandátov')
+    return fig
+
+
+def get_layout():
+    return html.Div([
+        html.H2("Scenáre rozdelenia mandátov", style={
+            'textAlign': 'center',
+            'marginBottom': '40px',
+            'marginTop': '20px',
+            'fontFamily': 'Roboto',
+            'color': 'black'
+        }),
+
+        html.P("Posuvníkmi sa mení podiel hlasov subjektov v %. Mandáty sa prepočítajú podľa republikového "
+               "volebného čísla a najväčších zostatkov, simulácia ukazuje rozptyl výsledku pri náhodnom "
+               "kolísaní podielov.", style={'textAlign': 'center', 'fontFamily': 'Roboto', 'fontSize': '18px'}),
+
+        html.Div([
+            html.Div([
+                html.Label(subjekt, style={'fontFamily': 'Roboto', 'fontWeight': 'bold'}),
+                dcc.Slider(
+                    id={"type": "scenar-podiel", "index": int(cislo)},
+                    min=0, max=40, step=0.1, value=float(podiel),
+                    marks={i: f"{i} %" for i in range(0, 41, 10)},
+                    tooltip={"placement": "bottom"}
+                )
+            ], style={'marginBottom': '10px'})
+            for cislo, subjekt, podiel in zip(hlavne_subjekty['Číslo politického subjektu'],
+                                             hlavne_subjekty['Názov politického subjektu'],
+                                             hlavne_subjekty['Podiel'])
+        ], style={'width': '80%', 'margin': '0 auto'}),
+
+        html.Div([
+            html.Label("Kvórum na vstup do parlamentu (%)", style={'fontFamily': 'Roboto', 'fontWeight': 'bold'}),
+            dcc.Slider(id="scenar-kvorum", min=3, max=10, step=0.5, value=seats.THRESHOLD,
+                       marks={i: f"{i} %" for i in range(3, 11)}),
+            html.Label("Neistota simulácie", style={'fontFamily': 'Roboto', 'fontWeight': 'bold', 'marginTop': '10px'}),
+            dcc.RadioItems(
+                id="scenar-neistota",
+                options=[{"label": "vypnutá", "value": "vypnutá"}] + [{"label": u, "value": u} for u in simulation.UNCERTAINTY],
+                value="stredná",
+                inline=True,
+                inputStyle={"marginRight": "5px", "marginLeft": "15px"}
+            ),
+        ], style={'width': '80%', 'margin': '20px auto', 'fontFamily': 'Roboto'}),
+
+        html.Div(id="scenar-suhrn", style={'textAlign': 'center', 'fontFamily': 'Roboto', 'fontSize': '16px'}),
+        dcc.Graph(id="scenar-mandaty"),
+        html.Hr(),
+        dcc.Graph(id="scenar-simulacia"),
+    ], style={'padding': '20px'})
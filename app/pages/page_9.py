@@ -0,0 +1,87 @@
+from dash import html, dcc
+from analytics import preferences, search
+
+# Počet návrhov v rozbaľovacom zozname
+POCET_NAVRHOV = 10
+
+# Čitateľné popisy poznámky z tab07a; kandidát bez poznámky nebol zvolený
+VYSLEDKY = {
+    "zvolený": "zvolený",
+    "náhradník": "náhradník",
+    preferences.WITHDRAWN: "vzdal sa kandidatúry alebo bol odvolaný",
+}
+
+# Index sa zostaví pri načítaní stránky, nie pri prvom stlačení klávesu
+search.prepare()
+
+
+def popis_kandidata(riadok):
+    return f"{riadok['Celé meno']} ({riadok['Názov politického subjektu']}, {riadok['Obec trvalého pobytu']})"
+
+
+# Návrhy pre rozbaľovací zoznam; "search" obsahuje text dopytu, aby zoznam nevyradil
+# návrhy nájdené bez diakritiky alebo s preklepom
+def navrhy(dopyt, vybrany=None):
+    moznosti = []
+    if dopyt:
+        vysledky = search.search(dopyt, limit=POCET_NAVRHOV)
+        moznosti = [{"label": popis_kandidata(riadok), "value": int(i), "search": dopyt}
+                    for i, riadok in vysledky.iterrows()]
+    riadok = search.candidate(vybrany) if vybrany is not None else None
+    if riadok is not None and vybrany not in [m["value"] for m in moznosti]:
+        moznosti.append({"label": popis_kandidata(riadok), "value": int(vybrany), "search": dopyt or ""})
+    return moznosti
+
+
+# Karta s údajmi vybraného kandidáta
+def detail_kandidata(vybrany):
+    if vybrany is None:
+        return html.P("Začnite písať meno, priezvisko, zamestnanie alebo obec kandidáta.",
+                      style={'textAlign': 'center', 'fontFamily': 'Roboto', 'color': 'gray'})
+
+    riadok = search.candidate(vybrany)
+    if riadok is None:
+        return html.P("Vybraný kandidát sa nenašiel, vyhľadajte ho znova.",
+                      style={'textAlign': 'center', 'fontFamily': 'Roboto', 'color': 'gray'})
+
+    titul = riadok['Titul'] if isinstance(riadok['Titul'], str) else "–"
+    vysledok = VYSLEDKY.get(riadok['Výsledok'], riadok['Výsledok']) if isinstance(riadok['Výsledok'], str) else "nezvolený"
+    udaje = [
+        ("Politický subjekt", riadok['Názov politického subjektu']),
+        ("Poradie na hlasovacom lístku", riadok['Poradie na hlasovacom lístku']),
+        ("Titul", titul),
+        ("Vek", riadok['Vek']),
+        ("Zamestnanie", riadok['Zamestnanie']),
+        ("Obec trvalého pobytu", riadok['Obec trvalého pobytu']),
+        ("Počet platných prednostných hlasov", f"{int(riadok['Počet platných prednostných hlasov']):,}".replace(",", " ")),
+        ("Výsledok", vysledok),
+    ]
+    return html.Div([
+        html.H3(riadok['Celé meno'], style={'fontFamily': 'Roboto', 'textAlign': 'center'}),
+        html.Table([
+            html.Tr([html.Th(nazov, style={'padding': '6px 12px', 'textAlign': 'left'}),
+                     html.Td(str(hodnota), style={'padding': '6px 12px'})])
+            for nazov, hodnota in udaje
+        ], style={'margin': '0 auto', 'fontFamily': 'Roboto', 'fontSize': '16px', 'backgroundColor': 'lavender'})
+    ])
+
+
+def get_layout():
+    return html.Div([
+        html.H2("Vyhľadávanie kandidátov", style={
+            'textAlign': 'center',
+            'marginBottom': '40px',
+            'marginTop': '20px',
+            'fontFamily': 'Roboto',
+            'color': 'black'
+        }),
+
+        dcc.Dropdown(
+            id="kandidat-hladanie",
+            options=[],
+            placeholder="Meno, priezvisko, zamestnanie alebo obec…",
+            style={"width": "70%", "margin": "0 auto", "fontFamily": "Roboto"}
+        ),
+
+        html.Div(id="kandidat-detail", children=detail_kandidata(None), style={"marginTop": "30px"})
+    ], style={'padding': '20px'})
@@ -0,0 +1,112 @@
+import json
+import queue
+import threading
+from flask import Response, abort
+
+# Kanály udalostí odosielaných serverom (Server-Sent Events). Zmena sa serializuje raz
+# a rovnaký text sa vloží do fronty každého pripojeného klienta; klient dostane len
+# časti, ktoré sa od poslednej správy zmenili, nový klient najprv celý aktuálny stav.
+# Kanály treba vopred zaregistrovať; iné názvy v adrese server odmietne.
+
+HEARTBEAT_SECONDS = 15
+QUEUE_SIZE = 16
+
+_channels = {}
+_lock = threading.Lock()
+
+
+# Registrácia kanála (napr. stránkou, ktorá ho používa); opakované volanie nič nezmení
+def add_channel(name):
+    with _lock:
+        _channels.setdefault(name, {"clients": set(), "state": {}})
+
+
+def has_channel(name):
+    with _lock:
+        return name in _channels
+
+
+def _channel(name):
+    channel = _channels.get(name)
+    if channel is None:
+        raise KeyError(f"Neznámy kanál: {name}")
+    return channel
+
+
+def _message(data):
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+# Zverejnenie stavu kanála; odošlú sa len kľúče s inou hodnotou ako v predchádzajúcom stave
+def publish(name, state):
+    with _lock:
+        channel = _channel(name)
+        changes = {key: value for key, value in state.items() if channel["state"].get(key) != value}
+        if not changes:
+            return 0
+        channel["state"].update(changes)
+        message = _message(changes)
+        snapshot = None
+        for client in channel["clients"]:
+            try:
+                client.put_nowait(message)
+            except queue.Full:
+                # Klient nestíha: staré správy sa zahodia a pošle sa mu celý aktuálny stav
+                snapshot = snapshot or _message(channel["state"])
+                _drain(client)
+                client.put_nowait(snapshot)
+        return len(channel["clients"])
+
+
+def _drain(client):
+    while True:
+        try:
+            client.get_nowait()
+        except queue.Empty:
+            return
+
+
+# Fronta nového klienta; ak kanál už má stav, je v nej ako prvá správa
+def subscribe(name):
+    client = queue.Queue(QUEUE_SIZE)
+    with _lock:
+        channel = _channel(name)
+        if channel["state"]:
+            client.put_nowait(_message(channel["state"]))
+        channel["clients"].add(client)
+    return client
+
+
+def unsubscribe(name, client):
+    with _lock:
+        _channel(name)["clients"].discard(client)
+
+
+def clients(name):
+    with _lock:
+        return len(_channels.get(name, {}).get("clients", ()))
+
+
+# Prúd správ vo formáte text/event-stream; pri nečinnosti sa posiela komentár, aby
+# proxy servery spojenie neukončili
+def stream(name, heartbeat=HEARTBEAT_SECONDS):
+    client = subscribe(name)
+    try:
+        while True:
+            try:
+                yield f"data: {client.get(timeout=heartbeat)}\n\n"
+            except queue.Empty:
+                yield ": ping\n\n"
+    finally:
+        unsubscribe(name, client)
+
+
+# Pripojenie trasy /udalosti/<kanál> k serveru Flask aplikácie Dash
+def register(server):
+    @server.route("/udalosti/<name>")
+    def udalosti(name):
+        if not has_channel(name):
+            abort(404)
+        return Response(stream(name), mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    return udalosti
@@ -0,0 +1,17 @@
+import sys
+
+# Moduly aplikácie sú v priečinku app/
+sys.path.insert(0, "app")
+import data_store
+import geometry
+
+# Prevod CSV súborov všetkých volieb z data/ do binárnej vyrovnávacej pamäte
+for election in data_store.elections():
+    for code, rebuilt in data_store.build_cache(election=election):
+        print(f"{election} {code}: {'prestavané' if rebuilt else 'aktuálne'}")
+
+# Zjednodušené geometrie krajov a ťažiská pre mapové stránky
+for level in geometry.build_cache():
+    print(f"geometria {level}: prestavané")
+
+print("Vyrovnávacia pamäť je pripravená.")
@@ -0,0 +1,46 @@
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+# Moduly aplikácie sú v priečinku app/
+sys.path.insert(0, "app")
+import figure_cache
+from pages import page_3
+
+
+# Vykreslenie mapy a údajov tabuliek jedného subjektu (beží v samostatnom procese)
+def vykresli_subjekt(subjekt):
+    png = page_3.vykresli_mapu(subjekt)
+    content_hash = hashlib.sha256(png).hexdigest()[:12]
+    cislo = int(page_3.data.loc[page_3.data["Názov politického subjektu"] == subjekt, "Číslo politického subjektu"].iloc[0])
+
+    file_name = f"subjekt-{cislo}-{content_hash}.png"
+    with open(os.path.join(page_3.PRERENDER_DIR, file_name), "wb") as f:
+        f.write(png)
+
+    return subjekt, {"map": f"maps/{file_name}", "tables": page_3.tabulky_data(subjekt)}
+
+
+if __name__ == "__main__":
+    os.makedirs(page_3.PRERENDER_DIR, exist_ok=True)
+    subjekty = [str(s) for s in page_3.subjekty]
+
+    with ProcessPoolExecutor() as pool:
+        subjects = dict(pool.map(vykresli_subjekt, subjekty))
+
+    # Zápis cez dočasný súbor, aby bežiaca aplikácia nikdy nečítala rozpísaný manifest
+    manifest = {"signature": figure_cache.source_signature(page_3.SOURCES), "subjects": subjects}
+    tmp_path = f"{page_3.PRERENDER_MANIFEST}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp_path, page_3.PRERENDER_MANIFEST)
+
+    # Odstránenie starých obrázkov, na ktoré nový manifest už neodkazuje
+    aktualne = {os.path.basename(s["map"]) for s in subjects.values()}
+    for file_name in os.listdir(page_3.PRERENDER_DIR):
+        if file_name.endswith(".png") and file_name not in aktualne:
+            os.remove(os.path.join(page_3.PRERENDER_DIR, file_name))
+
+    print(f"Predvykreslených subjektov: {len(subjects)}")
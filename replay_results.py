@@ -0,0 +1,16 @@
+import sys
+
+# Moduly aplikácie sú v priečinku app/
+sys.path.insert(0, "app")
+from analytics import live
+
+# Prehratie konečných okrskových výsledkov do priečinka priebežných výsledkov po dávkach
+# (náhrada za zdroj výsledkov počas volebnej noci)
+drop_dir = sys.argv[1] if len(sys.argv) > 1 else live.DROP_DIR or "live"
+precincts_per_file = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+delay = float(sys.argv[3]) if len(sys.argv) > 3 else 1.0
+
+for path in live.replay(drop_dir, precincts_per_file, delay):
+    print(path)
+
+print("Všetky okrsky sú zapísané.")